@@ -0,0 +1,177 @@
+import contextlib
+import io
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from parallel import SOLVERS
+
+# (이름, 솔버, 인자) — 이름은 결과 비교의 키이므로 인자를 바꾸면 이름도 바꿀 것
+DEFAULT_SUITE = [
+    ('exhaustive-100k', 'exhaustive', {'max_calls': 100000}),
+    ('h-iteration-5x10', 'h-iteration', {'branches': 5, 'n_iteration': 10}),
+    ('r-iteration-10k', 'r-iteration', {'max_iteration': 10000}),
+    ('n-iteration-10k', 'n-iteration', {'guess_limit': 10000}),
+    ('iterative-10k', 'iterative', {'guess_limit': 10000}),
+    ('beam-20-bound', 'beam', {'width': 20, 'heuristic': 'bound'}),
+    ('beam-20-score', 'beam', {'width': 20, 'heuristic': 'score'}),
+    ('mcts-200', 'mcts', {'max_iteration': 200}),
+]
+
+
+def generate_boards(n_boards, seed=0, n_rows=10, n_cols=17):
+    """
+    seed로 재현 가능한 게임과 비슷한 보드 n_boards개를 만듭니다.
+    칸마다 1~9를 고르게 뽑고, 실제 게임처럼 전체 합이 10의 배수가 되도록 칸 하나를 조정합니다.
+    """
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(n_boards):
+        grid = [[rng.randint(1, 9) for _ in range(n_cols)] for _ in range(n_rows)]
+        while sum(map(sum, grid)) % 10:
+            r = rng.randrange(n_rows)
+            c = rng.randrange(n_cols)
+            value = grid[r][c] - sum(map(sum, grid)) % 10
+            if value < 1:
+                value += 10
+            if value <= 9:
+                grid[r][c] = value
+        boards.append(grid)
+    return boards
+
+
+def run_case(solver, params, grid, memory=False, seed=None):
+    """
+    보드 하나에 솔버를 한 번 돌리고 점수, 시간, 노드 수, 최대 메모리를 dict로 반환합니다.
+    노드 수는 솔버의 progress 보고를 씁니다. memory=True이면 tracemalloc 추적 때문에 시간이 몇 배 늘어납니다.
+    """
+    reports = []
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        (score, _) = SOLVERS[solver](grid, progress=reports.append, seed=seed, **params)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    nodes = reports[-1]['nodes'] if reports else 0
+    return {'score': score, 'time': elapsed, 'nodes': nodes, 'peak_memory': peak}
+
+
+def run_suite(boards, suite=None, seed=0, memory=True):
+    """
+    suite의 (이름, 솔버, 인자)마다 모든 보드를 돌려 보드별 결과와 요약을 담은 목록을 반환합니다.
+    시간은 추적 없이 잰 값이고, memory=True이면 첫 보드를 tracemalloc으로 한 번 더 돌려 최대 메모리를 잽니다.
+    """
+    results = []
+    for (name, solver, params) in suite or DEFAULT_SUITE:
+        cases = []
+        for (i, grid) in enumerate(boards):
+            # 무작위를 쓰는 솔버도 같은 보드에서 같은 결과를 내도록 보드마다 seed를 고정
+            cases.append(run_case(solver, params, grid, seed=seed + i))
+        peak = None
+        if memory:
+            peak = run_case(solver, params, boards[0], memory=True, seed=seed)['peak_memory']
+        scores = [case['score'] for case in cases]
+        total_time = sum(case['time'] for case in cases)
+        total_nodes = sum(case['nodes'] for case in cases)
+        results.append({
+            'name': name,
+            'solver': solver,
+            'params': params,
+            'score_mean': sum(scores) / len(scores),
+            'score_min': min(scores),
+            'score_max': max(scores),
+            'time_mean': total_time / len(cases),
+            'nodes_mean': total_nodes / len(cases),
+            'nodes_per_sec': total_nodes / total_time if total_time > 0 else 0.0,
+            'peak_memory': peak,
+            'cases': cases,
+        })
+        print(f"{name:<20} score {results[-1]['score_mean']:7.2f}  time {results[-1]['time_mean']:8.3f}s  "
+              f"nodes/s {results[-1]['nodes_per_sec']:10.0f}  "
+              f"peak {(peak or 0) / 1024:9.0f} KiB")
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark(boards, seed=0, suite=None, memory=True, out=None):
+    """run_suite 결과에 실행 환경 정보를 붙여 반환하고, out이 있으면 JSON으로 저장합니다."""
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'seed': seed,
+            'boards': len(boards),
+            'memory': memory,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': run_suite(boards, suite, seed, memory),
+    }
+    if out:
+        with open(out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+    return report
+
+
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(old, new, tolerance=0.05):
+    """
+    두 benchmark 결과(dict 또는 JSON 경로)를 이름별로 비교해 출력하고 회귀한 이름 목록을 반환합니다.
+    평균 점수가 떨어지거나 평균 시간이 tolerance(비율) 넘게 늘면 회귀로 봅니다.
+    """
+    (old, new) = [_load(x) if isinstance(x, str) else x for x in (old, new)]
+    old_results = {result['name']: result for result in old['results']}
+    regressions = []
+    for result in new['results']:
+        before = old_results.get(result['name'])
+        if before is None:
+            continue
+        score_diff = result['score_mean'] - before['score_mean']
+        time_ratio = result['time_mean'] / before['time_mean'] if before['time_mean'] > 0 else 1.0
+        regressed = score_diff < 0 or time_ratio > 1 + tolerance
+        if regressed:
+            regressions.append(result['name'])
+        print(f"{result['name']:<20} score {score_diff:+7.2f}  time x{time_ratio:5.2f}"
+              f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main(argv):
+    n_boards = int(argv[argv.index('--boards')+1]) if '--boards' in argv else 20
+    seed = int(argv[argv.index('--seed')+1]) if '--seed' in argv else 0
+    out = argv[argv.index('--out')+1] if '--out' in argv else f"./benchmark_{time.time():.0f}.json"
+    only = argv[argv.index('--only')+1].split(',') if '--only' in argv else None
+    suite = [case for case in DEFAULT_SUITE if only is None or case[0] in only or case[1] in only]
+    if '--board' in argv:
+        from corpus import load_boards
+        boards = load_boards(argv[argv.index('--board')+1])[:n_boards]
+    else:
+        boards = generate_boards(n_boards, seed)
+    report = benchmark(boards, seed, suite, memory='--no-memory' not in argv, out=out)
+    print(f"Saved to {out}")
+    if '--compare' in argv:
+        regressions = compare(argv[argv.index('--compare')+1], report)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,90 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Board:
+    """
+    솔버 상태용 압축 보드.
+    n_rows * n_cols 칸의 값을 행 우선(row-major) bytes 하나에 담습니다(칸당 1바이트, 10x17이면 170바이트).
+    불변 객체이므로 여러 스택 항목이 복사 없이 공유할 수 있고, bytes 해시가 캐시되므로 해시/비교가 빠릅니다.
+    board[r][c], len(board)로 2D 리스트처럼 읽을 수 있습니다.
+    """
+    __slots__ = ('n_rows', 'n_cols', 'cells')
+
+    def __init__(self, n_rows, n_cols, cells):
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.cells = bytes(cells)
+
+    @classmethod
+    def from_grid(cls, grid):
+        if isinstance(grid, Board):
+            return grid
+        n_rows = len(grid)
+        n_cols = len(grid[0]) if n_rows else 0
+        return cls(n_rows, n_cols, bytes(v for row in grid for v in row))
+
+    def to_grid(self):
+        n_cols = self.n_cols
+        return [list(self.cells[r * n_cols:(r + 1) * n_cols]) for r in range(self.n_rows)]
+
+    def array(self):
+        """(n_rows, n_cols) uint8 NumPy 뷰(복사 없음, 읽기 전용)."""
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.n_rows, self.n_cols)
+
+    def clear(self, top_left, bottom_right):
+        """
+        영역을 0으로 만든 새 Board와 지운 칸 목록 [(r, c, value), ...]을 반환합니다.
+        행마다 슬라이스 대입 한 번으로 지우므로 그리드 전체를 복사하는 것보다 훨씬 쌉니다.
+        """
+        (r1, c1) = top_left
+        (r2, c2) = bottom_right
+        n_cols = self.n_cols
+        cells = bytearray(self.cells)
+        blank = bytes(c2 - c1 + 1)
+        removed = []
+        for r in range(r1, r2 + 1):
+            base = r * n_cols
+            for c in range(c1, c2 + 1):
+                v = cells[base + c]
+                if v != 0:
+                    removed.append((r, c, v))
+            cells[base + c1:base + c2 + 1] = blank
+        if not removed:
+            return self, removed
+        return Board(self.n_rows, n_cols, cells), removed
+
+    def restore(self, removed):
+        """clear가 반환한 목록으로 지운 칸을 되돌린 새 Board를 반환합니다."""
+        if not removed:
+            return self
+        n_cols = self.n_cols
+        cells = bytearray(self.cells)
+        for (r, c, v) in removed:
+            cells[r * n_cols + c] = v
+        return Board(self.n_rows, n_cols, cells)
+
+    def count_nonzero(self):
+        return len(self.cells) - self.cells.count(0)
+
+    def __len__(self):
+        return self.n_rows
+
+    def __getitem__(self, r):
+        n_cols = self.n_cols
+        return self.cells[r * n_cols:(r + 1) * n_cols]
+
+    def __iter__(self):
+        for r in range(self.n_rows):
+            yield self[r]
+
+    def __eq__(self, other):
+        return isinstance(other, Board) and self.n_cols == other.n_cols and self.cells == other.cells
+
+    def __hash__(self):
+        return hash(self.cells)
+
+    def __repr__(self):
+        return f"Board({self.n_rows}x{self.n_cols}, {self.cells.hex()})"
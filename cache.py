@@ -0,0 +1,111 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+
+from board import Board
+
+DEFAULT_CACHE_PATH = 'solutions.sqlite'
+
+# 결과를 바꾸지 않는(콜백) 인자와 매번 달라지는(시간 예산) 인자는 키에서 뺌.
+# 시간 예산이 있거나 취소된 탐색의 답은 complete=0으로 저장되어 탐색 없이 바로 쓰이지 않음
+_UNKEYED = {'initial_grid', 'time_budget', 'progress', 'cancel', 'shared_best'}
+
+# seed를 쓰지 않는 결정적 솔버는 seed가 달라도 같은 답이므로 seed도 키에서 뺌
+_SEEDLESS = {'exhaustive', 'r-iteration', 'beam'}
+
+
+def board_key(grid):
+    """보드의 정규 해시 (크기 + 칸 값). 2D 리스트와 Board가 같은 키를 냅니다."""
+    board = Board.from_grid(grid)
+    return hashlib.sha1(bytes([board.n_rows, board.n_cols]) + board.cells).hexdigest()
+
+
+def params_key(solver, params, seed=True):
+    """솔버 이름과 인자를 정렬된 JSON 문자열로 만듭니다. seed=False이면 seed를 빼고 만듭니다."""
+    keyed = {name: value for (name, value) in params.items()
+             if name not in _UNKEYED and not (name == 'seed' and (solver in _SEEDLESS or not seed))}
+    return json.dumps([solver, keyed], sort_keys=True)
+
+
+class SolutionCache:
+    """
+    보드 해시 + 솔버 인자별로 지금까지 찾은 최고 (점수, 행동 순서)를 저장하는 SQLite 캐시.
+    같은 보드를 다시 풀 때 탐색 없이 바로 답을 돌려주고, 나중에 더 좋은 답을 찾으면 그것으로 바꿉니다.
+    complete는 그 답이 시간 예산이나 취소 없이 끝까지 탐색한 결과인지이며, get()과 best()는 complete인 답만 돌려줍니다.
+    base는 seed를 뺀 인자 키로, seed를 정하지 않은 탐색이 다른 seed로 찾아 둔 답을 찾을 때(best) 씁니다.
+    호출마다 연결을 새로 열므로 GUI의 탐색 스레드에서도 쓸 수 있습니다.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS solutions ('
+                         'board TEXT, params TEXT, score INTEGER, sequence TEXT, updated REAL, '
+                         'complete INTEGER DEFAULT 0, base TEXT, PRIMARY KEY (board, params))')
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(solutions)')]
+            if 'complete' not in columns:
+                # 예전 파일: 저장된 답이 끝까지 탐색한 것인지 알 수 없으므로 모두 complete=0
+                conn.execute('ALTER TABLE solutions ADD COLUMN complete INTEGER DEFAULT 0')
+            if 'base' not in columns:
+                conn.execute('ALTER TABLE solutions ADD COLUMN base TEXT')
+
+    def get(self, grid, solver, params):
+        """끝까지 탐색해서 저장된 (점수, 행동 순서) 또는 None."""
+        with closing(sqlite3.connect(self.path)) as conn:
+            row = conn.execute('SELECT score, sequence FROM solutions WHERE board = ? AND params = ? AND complete',
+                               (board_key(grid), params_key(solver, params))).fetchone()
+        return None if row is None else (row[0], _decode(row[1]))
+
+    def best(self, grid, solver, params):
+        """seed와 상관없이 같은 보드/솔버/인자로 끝까지 탐색해서 저장된 최고 (점수, 행동 순서) 또는 None."""
+        with closing(sqlite3.connect(self.path)) as conn:
+            row = conn.execute('SELECT score, sequence FROM solutions WHERE board = ? AND base = ? AND complete '
+                               'ORDER BY score DESC LIMIT 1',
+                               (board_key(grid), params_key(solver, params, seed=False))).fetchone()
+        return None if row is None else (row[0], _decode(row[1]))
+
+    def put(self, grid, solver, params, score, move_sequence, complete=True):
+        """
+        점수가 저장된 것보다 높을 때만 답을 바꾸고, 저장 후의 최고 (점수, 행동 순서)를 반환합니다.
+        complete는 한 번이라도 끝까지 탐색한 적이 있으면 유지됩니다.
+        """
+        (board, key) = (board_key(grid), params_key(solver, params))
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            (sequence, now) = (json.dumps(move_sequence), time.time())
+            conn.execute('INSERT INTO solutions (board, params, score, sequence, updated, complete, base) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                         'ON CONFLICT (board, params) DO UPDATE SET complete = solutions.complete OR excluded.complete, '
+                         'base = excluded.base',
+                         (board, key, score, sequence, now, int(complete), params_key(solver, params, seed=False)))
+            conn.execute('UPDATE solutions SET score = ?, sequence = ?, updated = ? '
+                         'WHERE board = ? AND params = ? AND score < ?',
+                         (score, sequence, now, board, key, score))
+            row = conn.execute('SELECT score, sequence FROM solutions WHERE board = ? AND params = ?',
+                               (board, key)).fetchone()
+        return row[0], _decode(row[1])
+
+
+def _decode(sequence):
+    return [(tuple(top_left), tuple(bottom_right)) for (top_left, bottom_right) in json.loads(sequence)]
+
+
+def cached_search(cache, solver, search_func, /, refresh=False, any_seed=False, **argument):
+    """
+    캐시에 같은 보드/인자로 끝까지 탐색한 답이 있으면 탐색 없이 반환하고, 없으면(또는 refresh) 탐색해서 저장합니다.
+    any_seed는 사용자가 seed를 정하지 않았다는 뜻으로, 이때는 seed가 달라도 같은 보드/솔버/인자의 최고 답을 씁니다.
+    반환은 탐색 결과와 저장돼 있던 답 중 더 좋은 쪽입니다.
+    시간 예산이 있거나 취소된 탐색의 결과는 더 좋을 때 저장되지만 다음 탐색을 건너뛰게 하지는 않습니다.
+    앞의 세 인자는 위치 전용이라 argument에 solver 등 같은 이름이 있어도(parallel_solver) 그대로 search_func에 전달됩니다.
+    """
+    grid = argument['initial_grid']
+    if not refresh:
+        hit = cache.best(grid, solver, argument) if any_seed else cache.get(grid, solver, argument)
+        if hit is not None:
+            print(f"Cache hit: {hit[0]}")
+            return hit
+    (max_score, move_sequence) = search_func(**argument)
+    cancel = argument.get('cancel')
+    complete = not argument.get('time_budget') and not (cancel is not None and cancel.is_set())
+    return cache.put(grid, solver, argument, max_score, move_sequence, complete)
@@ -0,0 +1,77 @@
+_CATALOGS = {}
+
+# bytes.translate 표: 값이 0인 칸은 1, 나머지는 0
+_ZERO_LANES = bytes([1] + [0] * 255)
+
+
+class RectCatalog:
+    """
+    (n_rows, n_cols) 보드의 모든 직사각형에 대한 미리 계산된 표. 보드 크기마다 한 번만 만듭니다(rect_catalog).
+    직사각형 번호(rid)는 find_all_sum_10_areas의 탐색 순서(r1, r2, c1, c2)와 같습니다.
+    - rects[rid]: (r1, c1, r2, c2), moves[rid]: ((r1, c1), (r2, c2)), ids[move]: rid
+    - area[rid]: 칸 수
+    - cells[rid]: 덮는 칸 번호(r * n_cols + c) 목록, cover[칸 번호]: 그 칸을 덮는 rid 목록 (역색인)
+    - cell_mask[rid]: 덮는 칸의 비트마스크, border_mask[rid]: 바로 바깥 위/아래/왼쪽/오른쪽 칸의 비트마스크
+    비트마스크는 칸 번호 i를 비트 8 * i에 두는 바이트 단위 마스크라서,
+    Board.cells에서 zero_mask()로 C 수준 변환 한 번에 같은 형식의 마스크를 얻을 수 있습니다.
+    """
+
+    def __init__(self, n_rows, n_cols):
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.rects = []
+        self.cells = []
+        self.cell_mask = []
+        self.border_mask = []
+        self.cover = [[] for _ in range(n_rows * n_cols)]
+        for r1 in range(n_rows):
+            for r2 in range(r1, n_rows):
+                for c1 in range(n_cols):
+                    for c2 in range(c1, n_cols):
+                        rid = len(self.rects)
+                        self.rects.append((r1, c1, r2, c2))
+                        cells = [r * n_cols + c for r in range(r1, r2 + 1) for c in range(c1, c2 + 1)]
+                        border = []
+                        if r1 > 0:
+                            border += [(r1 - 1) * n_cols + c for c in range(c1, c2 + 1)]
+                        if r2 < n_rows - 1:
+                            border += [(r2 + 1) * n_cols + c for c in range(c1, c2 + 1)]
+                        if c1 > 0:
+                            border += [r * n_cols + c1 - 1 for r in range(r1, r2 + 1)]
+                        if c2 < n_cols - 1:
+                            border += [r * n_cols + c2 + 1 for r in range(r1, r2 + 1)]
+                        for i in cells:
+                            self.cover[i].append(rid)
+                        self.cells.append(cells)
+                        self.cell_mask.append(_mask(cells))
+                        self.border_mask.append(_mask(border))
+        self.moves = [((r1, c1), (r2, c2)) for (r1, c1, r2, c2) in self.rects]
+        self.ids = {move: rid for (rid, move) in enumerate(self.moves)}
+        self.area = [len(cells) for cells in self.cells]
+        # 0 포함/인접 검사용: 안쪽 + 테두리
+        self.near_mask = [cell | border for (cell, border) in zip(self.cell_mask, self.border_mask)]
+
+    def touches_zero(self, rid, zeros):
+        """직사각형이 0인 칸을 포함하거나 그 칸에 상하좌우로 붙어 있는지. zeros는 zero_mask(board)."""
+        return self.near_mask[rid] & zeros != 0
+
+
+def _mask(cells):
+    mask = 0
+    for i in cells:
+        mask |= 1 << (8 * i)
+    return mask
+
+
+def rect_catalog(n_rows, n_cols):
+    """보드 크기별 RectCatalog (처음 한 번만 만들고 캐시)."""
+    key = (n_rows, n_cols)
+    catalog = _CATALOGS.get(key)
+    if catalog is None:
+        catalog = _CATALOGS[key] = RectCatalog(n_rows, n_cols)
+    return catalog
+
+
+def zero_mask(board):
+    """Board에서 값이 0인 칸의 비트마스크 (RectCatalog와 같은 바이트 단위 형식)."""
+    return int.from_bytes(board.cells.translate(_ZERO_LANES), 'little')
@@ -12,16 +12,20 @@ app.use(bodyParser.json()); // To parse JSON request bodies
 
 // POST endpoint to store 2D array data
 app.post("/data", (req, res) => {
-  const { data } = req.body; // Expecting data to be a string representing a 2D array
+  const { data } = req.body; // Expecting a string representing a 2D array, or an array of such strings (batch)
 
-  if (typeof data !== "string") {
-    return res.status(400).json({ error: "Data must be a string." });
+  const items = Array.isArray(data) ? data : [data];
+  if (items.length === 0 || items.some((item) => typeof item !== "string")) {
+    return res.status(400).json({ error: "Data must be a string or an array of strings." });
   }
 
-  const key = nanoid(10); // Generate a 10-character unique key
-  dataStore[key] = data;
+  const keys = items.map((item) => {
+    const key = nanoid(10); // Generate a 10-character unique key
+    dataStore[key] = item;
+    return key;
+  });
 
-  res.status(201).json({ key });
+  res.status(201).json(Array.isArray(data) ? { keys } : { key: keys[0] });
 });
 
 // GET endpoint to retrieve 2D array data
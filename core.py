@@ -1,8 +1,18 @@
-import pyautogui
-from pyautogui import ImageNotFoundException
+import pyscreeze
+from board import Board
 from util import cluster_positions
 import time
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from PIL import Image
+
+try:
+    import pyautogui
+    from pyautogui import ImageNotFoundException
+except Exception:
+    # 디스플레이가 없는 환경(corpus 재생 등)에서는 화면 캡처와 마우스 조작 없이 screenshot 인자로만 인식
+    pyautogui = None
+    from pyscreeze import ImageNotFoundException
 
 def restart_game():
     try:
@@ -15,58 +25,203 @@ def restart_game():
     except (ImageNotFoundException, TypeError):
         print("Could not find reset or play button.")
 
-def solve(move_sequence, pos_dict, initial_grid, difficulty):
+def _executable(move, pos_dict, initial_grid=None):
+    """plan_drags가 이 행동을 드래그로 바꾸는지 (양 끝 칸 위치를 알고, 시작 칸이 처음부터 비어 있지 않음)."""
+    (top_left, bottom_right) = move
+    if top_left not in pos_dict or bottom_right not in pos_dict:
+        return False
+    return initial_grid is None or initial_grid[top_left[0]][top_left[1]] != 0
+
+
+def plan_drags(move_sequence, pos_dict, initial_grid=None):
+    """
+    행동 순서를 화면 드래그 좌표 [((start_x, start_y), (end_x, end_y)), ...]로 미리 바꿉니다.
+    칸 위치를 모르는 행동과, initial_grid를 주면 그 보드에서 시작 칸이 비어 있던 행동은 건너뜁니다.
+    """
+    drags = []
     for area in move_sequence:
+        if not _executable(area, pos_dict, initial_grid):
+            continue
         (top_left, bottom_right) = area
         r1, c1 = top_left
         r2, c2 = bottom_right
-        if (r1, c1) not in pos_dict or (r2, c2) not in pos_dict:
-            continue
         left1, top1, w1, h1 = pos_dict[(r1, c1)]
         left2, top2, w2, h2 = pos_dict[(r2, c2)]
-        start_x = left1 + w1 // 2 - 10
-        start_y = top1 + h1 // 2 - 10
-        end_x = left2 + w2 // 2 + 10
-        end_y = top2 + h2 // 2 + 10
-        if initial_grid[r1][c1] == 0:
-            continue
-        pyautogui.mouseDown(start_x, start_y)
-        pyautogui.moveTo(end_x, end_y)
-        time.sleep((10-difficulty)*0.08)
-        pyautogui.moveRel((1, 1))
-        pyautogui.mouseUp()
+        start = (left1 + w1 // 2 - 10, top1 + h1 // 2 - 10)
+        end = (left2 + w2 // 2 + 10, top2 + h2 // 2 + 10)
+        drags.append((start, end))
+    return drags
+
+
+def run_drags(drags, hold=0.0, rate=None):
+    """
+    미리 계산한 드래그를 차례로 실행하고 단계별 시간 통계를 반환합니다.
+    pyautogui의 호출마다 붙는 기본 대기(PAUSE)는 끄고, 대신
+    - hold: 목표 칸까지 끈 뒤 마우스를 떼기 전 기다리는 시간(초)
+    - rate: 초당 최대 드래그 수 (None이면 제한 없음). 드래그 시작 시각을 1 / rate 간격으로 맞춤
+    반환: {'actions', 'elapsed', 'actions_per_sec', 'phases': {'down', 'move', 'hold', 'up', 'wait': 누적 초}}
+    """
+    phases = dict.fromkeys(('down', 'move', 'hold', 'up', 'wait'), 0.0)
+    interval = 1.0 / rate if rate else 0.0
+    start = time.perf_counter()
+    next_start = start
+    for ((start_x, start_y), (end_x, end_y)) in drags:
+        t0 = time.perf_counter()
+        if t0 < next_start:
+            time.sleep(next_start - t0)
+        t1 = time.perf_counter()
+        pyautogui.mouseDown(start_x, start_y, _pause=False)
+        t2 = time.perf_counter()
+        pyautogui.moveTo(end_x, end_y, _pause=False)
+        t3 = time.perf_counter()
+        if hold > 0:
+            time.sleep(hold)
+        t4 = time.perf_counter()
+        pyautogui.moveRel(1, 1, _pause=False)
+        pyautogui.mouseUp(_pause=False)
+        t5 = time.perf_counter()
+        phases['wait'] += t1 - t0
+        phases['down'] += t2 - t1
+        phases['move'] += t3 - t2
+        phases['hold'] += t4 - t3
+        phases['up'] += t5 - t4
+        # 늦어진 드래그 뒤에도 몰아서 보내지 않도록 이번 시작 시각부터 간격을 둠
+        next_start = max(next_start, t1) + interval
+    elapsed = time.perf_counter() - start
+    return {
+        'actions': len(drags),
+        'elapsed': elapsed,
+        'actions_per_sec': len(drags) / elapsed if elapsed > 0 else 0.0,
+        'phases': phases,
+    }
+
+
+def solve(move_sequence, pos_dict, initial_grid, difficulty, rate=None, hold=None):
+    """
+    행동 순서를 게임 화면에서 실행합니다. 좌표는 시작 전에 모두 계산하고(plan_drags), run_drags로 실행합니다.
+    hold를 주지 않으면 예전과 같이 difficulty로 정합니다((10 - difficulty) * 0.08초).
+    실행 통계(run_drags 참고)에 실제로 드래그한 행동들로 지워졌어야 할 칸 수 'score'를 더해 출력하고 반환합니다.
+    (화면을 다시 읽어 확인한 값은 아니며, 확인하려면 play.play를 씁니다.)
+    """
+    if hold is None:
+        hold = (10 - difficulty) * 0.08
+    stats = run_drags(plan_drags(move_sequence, pos_dict, initial_grid), hold=hold, rate=rate)
+    board = Board.from_grid(initial_grid)
+    score = 0
+    for move in move_sequence:
+        if _executable(move, pos_dict, initial_grid):
+            board, removed = board.clear(*move)
+            score += len(removed)
+    stats['score'] = score
+    phases = ", ".join(f"{name} {seconds:.2f}s" for (name, seconds) in stats['phases'].items())
+    print(f"Executed {stats['actions']} moves in {stats['elapsed']:.2f}s "
+          f"({stats['actions_per_sec']:.1f}/s; {phases}), score {score}")
+    return stats
+
+
+# 직전 스캔에서 찾은 보드 영역 (left, top, width, height). 다음 스캔은 이 영역만 캡처해서 찾음
+_board_region = None
+
+
+def _grab(region=None, screenshot=None):
+    """screenshot(PIL 이미지 또는 파일 경로)이 있으면 그것을, 없으면 화면을 한 번 캡처해 반환합니다."""
+    if screenshot is None:
+        return pyautogui.screenshot(region=region)
+    image = Image.open(screenshot) if isinstance(screenshot, str) else screenshot
+    if region is not None:
+        (left, top, width, height) = region
+        image = image.crop((left, top, left + width, top + height))
+    return image
+
+
+def _screenshot_bgr(region=None, screenshot=None):
+    """캡처 한 장을 OpenCV 템플릿 매칭에 바로 쓸 수 있는 BGR 배열로 반환합니다."""
+    image = _grab(region, screenshot)
+    return np.ascontiguousarray(np.array(image.convert('RGB'))[:, :, ::-1])
+
+
+def _locate_digits(haystack, offset=(0, 0)):
+    """캡처 한 장에서 숫자 템플릿 9개를 모두 찾아 {숫자: [(left, top, width, height), ...]}로 반환합니다."""
+    (dx, dy) = offset
+    all_finds = {}
+    for num in range(1, 10):
+        try:
+            all_finds[num] = [(find.left + dx, find.top + dy, find.width, find.height)
+                              for find in pyscreeze.locateAll(f'images/{num}.png', haystack, confidence=0.9)]
+        except ImageNotFoundException:
+            # 보드에 없는 숫자
+            all_finds[num] = []
+    return all_finds
+
+
+def _is_full_grid(all_finds):
+    """찾은 칸들이 10x17 칸을 모두 덮는지 (열 17개, 행 10개로 묶이는지)."""
+    boxes = [box for finds in all_finds.values() for box in finds]
+    if not boxes:
+        return False
+    x_reps, _ = cluster_positions([left for (left, _, _, _) in boxes], threshold=20)
+    y_reps, _ = cluster_positions([top for (_, top, _, _) in boxes], threshold=20)
+    return len(x_reps) == 17 and len(y_reps) == 10
+
+
+def _region_around(finds):
+    """찾은 칸들을 감싸는 영역에 칸 하나 크기만큼 여유를 둔 캡처 영역을 반환합니다."""
+    lefts = [left for (left, _, _, _) in finds]
+    tops = [top for (_, top, _, _) in finds]
+    width = max(w for (_, _, w, _) in finds)
+    height = max(h for (_, _, _, h) in finds)
+    left = max(0, min(lefts) - width)
+    top = max(0, min(tops) - height)
+    return (left, top, max(lefts) + 2 * width - left, max(tops) + 2 * height - top)
 
 
-def scan():
+def capture():
+    """전체 화면을 한 번 캡처해 PIL 이미지로 반환합니다 (scan(screenshot=...)이나 corpus 기록용)."""
+    return pyautogui.screenshot()
+
+
+def scan(screenshot=None):
+    """
+    화면을 한 번만 캡처하고 그 이미지에서 숫자 템플릿 9개를 모두 찾아 보드를 읽습니다.
+    직전 스캔에서 찾은 보드 영역이 있으면 그 영역만 캡처하고, 거기서 오류가 나거나 10x17 칸을 모두 찾지 못하면
+    기억한 영역을 지우고 전체 화면으로 다시 찾습니다.
+    screenshot(PIL 이미지 또는 파일 경로)을 주면 화면 대신 그 이미지 전체에서 찾습니다(보드 영역은 기억하지 않음).
+    """
+    global _board_region
+    live = screenshot is None
+    all_finds = None
+    if live and _board_region is not None:
+        try:
+            all_finds = _locate_digits(_screenshot_bgr(_board_region), _board_region[:2])
+        except Exception as e:
+            print(f"Board region scan failed, scanning the full screen: {e}")
+        if all_finds is None or not _is_full_grid(all_finds):
+            # 창이 움직였거나 가려진 경우: 영역을 잊고 전체 화면에서 다시 찾음
+            all_finds = None
+            _board_region = None
     try:
-        one = list(pyautogui.locateAllOnScreen('images/1.png', confidence=0.9))
-        two = list(pyautogui.locateAllOnScreen('images/2.png', confidence=0.9))
-        three = list(pyautogui.locateAllOnScreen('images/3.png', confidence=0.9))
-        four = list(pyautogui.locateAllOnScreen('images/4.png', confidence=0.9))
-        five = list(pyautogui.locateAllOnScreen('images/5.png', confidence=0.9))
-        six = list(pyautogui.locateAllOnScreen('images/6.png', confidence=0.9))
-        seven = list(pyautogui.locateAllOnScreen('images/7.png', confidence=0.9))
-        eight = list(pyautogui.locateAllOnScreen('images/8.png', confidence=0.9))
-        nine = list(pyautogui.locateAllOnScreen('images/9.png', confidence=0.9))
+        if all_finds is None:
+            all_finds = _locate_digits(_screenshot_bgr(screenshot=screenshot))
     except Exception as e:
         print(f"An error occurred during screen scan: {e}")
         return [], [], [], {}
-        
+
     m = {}
     pos_dict = {}
-    all_finds = {1: one, 2: two, 3: three, 4: four, 5: five, 6: six, 7: seven, 8: eight, 9: nine}
-    
+
     processed_finds = []
     for num, finds in all_finds.items():
         num_finds = []
-        for find in finds:
-            num_finds.append((find.left, find.top))
-            m[(find.left, find.top)] = num
-            pos_dict[(find.left, find.top)] = (find.left, find.top, find.width, find.height)
+        for (left, top, width, height) in finds:
+            num_finds.append((left, top))
+            m[(left, top)] = num
+            pos_dict[(left, top)] = (left, top, width, height)
         processed_finds.append(num_finds)
 
     if not any(processed_finds):
         print("No number images found on the screen.")
+        if live:
+            _board_region = None
         return [], [], [], {}
 
     # Filter out empty lists before concatenation
@@ -88,6 +243,9 @@ def scan():
             if 0 <= row < 10 and 0 <= col < 17:
                 result[row][col] = m[(x, y)]
                 pos_dict[(row, col)] = pos_dict[(x, y)]
+        # 10x17 칸이 모두 잡혔을 때만 보드 영역을 기억함 (일부만 남은 보드로 영역이 줄어들지 않도록)
+        if live and len(x_reps) == 17 and len(y_reps) == 10:
+            _board_region = _region_around([box for finds in all_finds.values() for box in finds])
     else:
         x_reps, y_reps = [], []
         
@@ -95,6 +253,102 @@ def scan():
         print(row)
     return result, x_reps, y_reps, pos_dict
 
+_TEMPLATES = None  # {숫자: 회색조 float32 템플릿}
+
+
+def _templates():
+    global _TEMPLATES
+    if _TEMPLATES is None:
+        _TEMPLATES = {num: np.array(Image.open(f'images/{num}.png').convert('L'), dtype=np.float32)
+                      for num in range(1, 10)}
+    return _TEMPLATES
+
+
+def _match_scores(gray, tops, lefts, template):
+    """각 칸 (top, left)에 놓인 템플릿 크기 패치와 템플릿의 정규화 상관계수(-1~1)를 한 번에 계산합니다."""
+    (h, w) = template.shape
+    patches = sliding_window_view(gray, (h, w))[tops, lefts]  # (칸 수, h, w)
+    patches = patches - patches.mean(axis=(1, 2), keepdims=True)
+    t = template - template.mean()
+    norms = np.sqrt((patches * patches).sum(axis=(1, 2)) * (t * t).sum())
+    dots = (patches * t).sum(axis=(1, 2))
+    # 배경처럼 밝기 변화가 없는 패치는 어떤 숫자와도 닮지 않은 것으로 봄
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+
+def read_cells(cells, x_reps, y_reps, pos_dict, confidence=0.9, empty_below=0.5, screenshot=None):
+    """
+    이미 스캔한 칸 위치를 그대로 써서 cells [(r, c), ...]의 값만 읽습니다.
+    cells를 감싸는 영역만 한 번 캡처해 칸마다 템플릿 크기 패치를 숫자 템플릿 9개와 비교하고,
+    가장 닮은 숫자의 점수가 confidence 이상이면 그 숫자, empty_below 미만이면 빈 칸(0), 그 사이면 None(불확실)입니다.
+    캡처에 실패하면 모두 None입니다. screenshot을 주면 화면 대신 그 이미지(전체 화면 기준 좌표)를 씁니다.
+    """
+    if not cells:
+        return []
+    templates = _templates()
+    origins = np.array([pos_dict[(r, c)][:2] if (r, c) in pos_dict else (x_reps[c], y_reps[r])
+                        for (r, c) in cells])
+    max_h = max(t.shape[0] for t in templates.values())
+    max_w = max(t.shape[1] for t in templates.values())
+    (left, top) = origins.min(axis=0)
+    (right, bottom) = origins.max(axis=0) + (max_w, max_h)
+    try:
+        image = _grab((int(left), int(top), int(right - left), int(bottom - top)), screenshot)
+    except Exception as e:
+        print(f"An error occurred during screen rescan: {e}")
+        return [None] * len(cells)
+    gray = np.array(image.convert('L'), dtype=np.float32)
+    lefts = origins[:, 0] - left
+    tops = origins[:, 1] - top
+
+    scores = np.stack([_match_scores(gray, tops, lefts, templates[num]) for num in range(1, 10)])  # (9, 칸 수)
+    best = scores.max(axis=0)
+    digits = np.where(best >= confidence, scores.argmax(axis=0) + 1, 0)
+    return [None if empty_below <= score < confidence else int(digit) for (score, digit) in zip(best, digits)]
+
+
+def rescan(x_reps, y_reps, pos_dict, confidence=0.9, empty_below=0.5, screenshot=None, previous=None):
+    """
+    이미 스캔한 보드의 칸 위치(x_reps, y_reps, pos_dict)를 그대로 쓰는 빠른 재스캔.
+    보드 영역을 한 번 캡처해 모든 칸을 read_cells로 읽습니다.
+    다음 경우에는 창이 움직였거나 화면이 가려진 것으로 보고, 기억한 보드 영역을 지운 뒤 scan()으로 다시 읽습니다.
+    - 불확실한 칸이 하나라도 있음
+    - 숫자를 하나도 못 읽음 (가려진 칸은 배경만 보여 확실한 빈 칸으로 읽힘)
+    - previous(직전 보드)에서 비어 있던 칸에 숫자가 있음
+    scan()도 실패하면 빈 칸 위치가 반환되므로 호출한 쪽의 다음 스캔은 전체 스캔이 됩니다.
+    screenshot을 주면 화면 대신 그 이미지(전체 화면 기준 좌표)를 씁니다. 반환 형식은 scan()과 같습니다.
+    """
+    global _board_region
+    if len(x_reps) != 17 or len(y_reps) != 10:
+        return scan(screenshot)
+    cells = [(r, c) for r in range(10) for c in range(17)]
+    digits = read_cells(cells, x_reps, y_reps, pos_dict, confidence, empty_below, screenshot)
+    reason = None
+    if None in digits:
+        reason = "confidence too low"
+    elif not any(digits):
+        reason = "no digits found"
+    elif previous and any(digit and not previous[r][c] for ((r, c), digit) in zip(cells, digits)):
+        reason = "digits appeared in cleared cells"
+    if reason:
+        print(f"Rescan {reason}, falling back to full scan.")
+        _board_region = None
+        return scan(screenshot)
+
+    templates = _templates()
+    result = [[0] * 17 for _ in range(10)]
+    new_pos_dict = dict(pos_dict)
+    for ((r, c), digit) in zip(cells, digits):
+        result[r][c] = digit
+        if digit:
+            (left, top) = pos_dict[(r, c)][:2] if (r, c) in pos_dict else (x_reps[c], y_reps[r])
+            template = templates[digit]
+            new_pos_dict[(r, c)] = (int(left), int(top), template.shape[1], template.shape[0])
+
+    for row in result:
+        print(row)
+    return result, x_reps, y_reps, new_pos_dict
+
 def get_cluster_positions(positions, threshold=20):
     if not positions:
         return [], {}
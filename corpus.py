@@ -0,0 +1,61 @@
+import json
+import os
+import time
+
+import numpy as np
+
+
+def iter_records(path):
+    """
+    보드 corpus 파일을 한 줄(한 보드)씩 읽습니다. 화면 없이 인식/탐색을 재생할 때 씁니다.
+    - .npy: (보드 수, 10, 17) uint8 배열. {'grid': grid}만 나옴
+    - .jsonl: 한 줄에 {"grid": [[...]], "screenshot": "원본 화면 PNG 경로(선택)", ...}
+      screenshot 경로는 corpus 파일 기준 상대 경로이고, 읽을 때 실제 경로로 바꿔 줍니다.
+    """
+    if path.endswith('.npy'):
+        for board in np.load(path):
+            yield {'grid': board.tolist()}
+        return
+    base = os.path.dirname(path)
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('screenshot'):
+                record['screenshot'] = os.path.join(base, record['screenshot'])
+            yield record
+
+
+def load_boards(path):
+    """corpus의 보드를 모두 2D 리스트로 읽어 반환합니다."""
+    return [record['grid'] for record in iter_records(path)]
+
+
+def save_boards(path, grids):
+    """보드 목록을 .npy(압축 uint8 배열) 또는 .jsonl로 저장합니다. Board 객체도 받습니다."""
+    grids = [[list(row) for row in grid] for grid in grids]
+    if path.endswith('.npy'):
+        np.save(path, np.array(grids, dtype=np.uint8))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        for grid in grids:
+            f.write(json.dumps({'grid': grid}) + '\n')
+
+
+def append_record(path, grid, screenshot=None, **fields):
+    """
+    .jsonl corpus 끝에 보드 하나를 추가합니다.
+    screenshot(PIL 이미지)을 주면 corpus 옆 <이름>_screens/ 폴더에 PNG로 저장하고 그 경로를 함께 기록합니다.
+    fields는 점수, 시간 등 함께 남길 값입니다.
+    """
+    record = {'grid': [list(row) for row in grid], **fields}
+    if screenshot is not None:
+        folder = os.path.splitext(path)[0] + '_screens'
+        os.makedirs(folder, exist_ok=True)
+        name = f"{time.time_ns()}.png"
+        screenshot.save(os.path.join(folder, name))
+        record['screenshot'] = os.path.join(os.path.basename(folder), name)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
@@ -0,0 +1,89 @@
+import statistics
+import time
+from collections import deque
+
+from core import restart_game, scan, solve
+from corpus import append_record
+from play import play
+
+
+def _summary(history, target):
+    """
+    최근 게임 기록으로 시간당 게임 수와 점수 분포 한 줄을 만듭니다.
+    점수 분포와 목표 달성 비율은 실제로 실행한 게임의 점수(score) 기준이고, 탐색 점수(planned) 평균을 함께 보여 줍니다.
+    """
+    elapsed = sum(record['total'] for record in history)
+    scores = [record['score'] for record in history if record['executed']]
+    planned = [record['planned'] for record in history]
+    line = (f"Last {len(history)} games: {3600 * len(history) / elapsed:.1f} games/h, "
+            f"{3600 * len(scores) / elapsed:.1f} played/h, planned mean {statistics.mean(planned):.1f}")
+    if scores:
+        line += (f", score mean {statistics.mean(scores):.1f} / median {statistics.median(scores):g} / "
+                 f"min {min(scores)} / max {max(scores)}")
+        if target:
+            line += f", >= {target}: {sum(score >= target for score in scores)}/{len(scores)}"
+    return line
+
+
+def grind(search_func, argument, games=None, target=None, log_path='grind.jsonl', window=20, restart_wait=1.0,
+          difficulty=10, rate=None, verify=None):
+    """
+    무인 연속 플레이. 게임마다 재시작 → scan → 탐색 → 실행을 반복하고 단계별 시간을 잽니다.
+    - target: 찾은 점수가 이보다 낮으면 실행하지 않고 바로 재시작
+    - games: 이만큼 게임하면 멈춤 (None이면 Ctrl+C까지)
+    - log_path: 게임마다 보드와 점수, 단계별 시간을 JSONL corpus로 기록 (--board로 다시 재생 가능)
+    - window: 시간당 게임 수와 점수 분포를 계산할 최근 게임 수
+    - verify: K이면 play()로 K수마다 확인하며 실행
+    argument에 seed가 있으면 게임마다 seed + 게임 번호를 씁니다. 기록 목록을 반환합니다.
+    """
+    base_seed = argument.get('seed')
+    history = deque(maxlen=window)
+    records = []
+    game = 0
+    try:
+        while games is None or game < games:
+            times = {}
+            start = time.perf_counter()
+            restart_game()
+            time.sleep(restart_wait)
+            times['restart'] = time.perf_counter() - start
+
+            stage = time.perf_counter()
+            initial_grid, x_reps, y_reps, pos_dict = scan()
+            times['scan'] = time.perf_counter() - stage
+            if not initial_grid:
+                print("Scan failed, restarting.")
+                continue
+
+            stage = time.perf_counter()
+            seed = None if base_seed is None else base_seed + game
+            max_score, move_sequence = search_func(**dict(argument, initial_grid=initial_grid, seed=seed))
+            times['search'] = time.perf_counter() - stage
+
+            # 목표 점수에 못 미치면 실행하지 않고 바로 다음 게임
+            executed = not target or max_score >= target
+            stage = time.perf_counter()
+            score = None
+            if executed and verify:
+                score = play(initial_grid, move_sequence, x_reps, y_reps, pos_dict, check_every=verify,
+                             difficulty=difficulty, rate=rate)['score']
+            elif executed:
+                score = solve(move_sequence, pos_dict, initial_grid, difficulty=difficulty, rate=rate)['score']
+            times['execute'] = time.perf_counter() - stage
+            times['total'] = time.perf_counter() - start
+
+            # planned: 탐색이 찾은 점수, score: 실제로 실행한 점수 (--verify면 화면으로 확인한 값, 건너뛰면 None)
+            record = {'game': game, 'planned': max_score, 'score': score, 'executed': executed, 'seed': seed,
+                      **times}
+            append_record(log_path, initial_grid, **record)
+            history.append(record)
+            records.append(record)
+            game += 1
+            print(f"Game {game}: planned {max_score}, " + (f"score {score}, " if executed else "skipped, ")
+                  + ", ".join(f"{name} {times[name]:.2f}s" for name in ('restart', 'scan', 'search', 'execute')))
+            print(_summary(history, target))
+    except KeyboardInterrupt:
+        print("Stopped.")
+    if records:
+        print(_summary(records, target))
+    return records
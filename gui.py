@@ -1,19 +1,37 @@
 import sys
 import io
+import os
+import threading
+import random
 from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QComboBox, QLabel, QGridLayout, QFrame, QSlider, QTextEdit, QSplitter,
-                             QGroupBox, QSpinBox, QAbstractSpinBox)
+                             QGroupBox, QSpinBox, QDoubleSpinBox, QAbstractSpinBox, QCheckBox)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QObject, QPoint
 from PyQt6.QtGui import QFont, QColor
-from search import iterative_solver, h_iteration_solver, r_iteration_solver, exhaustive_solver, n_iterative_solver
+from search import iterative_solver, h_iteration_solver, r_iteration_solver, exhaustive_solver, n_iterative_solver, beam_solver, mcts_solver, DEFAULT_TT_SIZE, HEURISTICS
+from parallel import parallel_solver
+from cache import SolutionCache, cached_search
+from functools import partial
 
-from core import scan, solve, restart_game
+from core import scan, rescan, solve, restart_game
+from play import play, play_pipelined
 from util import send_data
 
 class EmittingStream(QObject):
     textWritten = pyqtSignal(str)
-    def write(self, text): self.textWritten.emit(str(text))
-    def flush(self): pass
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.buffer = ""
+    def write(self, text):
+        # write마다 시그널을 보내지 않고 줄 단위로 모아서 보냄
+        self.buffer += str(text)
+        if "\n" in self.buffer:
+            (lines, self.buffer) = self.buffer.rsplit("\n", 1)
+            self.textWritten.emit(lines + "\n")
+    def flush(self):
+        if self.buffer:
+            self.textWritten.emit(self.buffer)
+            self.buffer = ""
 
 THEMES = {
     "Dark": {
@@ -52,14 +70,20 @@ THEMES = {
 
 class SolverThread(QThread):
     result_ready = pyqtSignal(int, list)
+    progress_ready = pyqtSignal(dict)
     finished = pyqtSignal()
     def __init__(self, solver_func, kwargs):
         super().__init__()
         self.solver_func = solver_func
         self.kwargs = kwargs
+        self.cancel_event = threading.Event()
+    def cancel(self):
+        # 솔버가 다음 확인 시점에 멈추고 지금까지의 최고를 result_ready로 보냄
+        self.cancel_event.set()
     def run(self):
         try:
-            max_score, move_sequence = self.solver_func(**self.kwargs)
+            max_score, move_sequence = self.solver_func(progress=self.progress_ready.emit, cancel=self.cancel_event,
+                                                        **self.kwargs)
             self.result_ready.emit(max_score, move_sequence)
         except Exception as e:
             print(f"Error in solver thread: {e}")
@@ -76,9 +100,12 @@ class App(QWidget):
         
         self.initial_grid = None
         self.pos_dict = None
+        self.x_reps = None
+        self.y_reps = None
         self.solver_thread = None
         self.last_move_sequence = None
         self.current_theme = "Dark"
+        self.solution_cache = SolutionCache()
 
         self.init_ui()
         self.apply_theme(self.current_theme)
@@ -163,15 +190,49 @@ class App(QWidget):
         self.action_controls_frame = QFrame()
         self.action_controls_frame.setObjectName('action-controls-frame')
         action_controls_layout = QVBoxLayout(self.action_controls_frame)
-        self.action_controls_frame.setFixedHeight(220)
+        self.action_controls_frame.setFixedHeight(260)
         algo_layout = QHBoxLayout()
         self.algo_label = QLabel("Algorithm:")
         algo_layout.addWidget(self.algo_label)
         self.algorithm_dropdown = QComboBox()
-        self.algorithm_dropdown.addItems(["iterative", "exhaustive", "h-iteration", "r-iteration", "n-iteration"])
+        self.algorithm_dropdown.addItems(["iterative", "exhaustive", "h-iteration", "r-iteration", "n-iteration", "beam", "mcts"])
         self.algorithm_dropdown.currentTextChanged.connect(self.update_search_params)
         algo_layout.addWidget(self.algorithm_dropdown)
+        self.workers_label = QLabel("Workers:")
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setButtonSymbols(QAbstractSpinBox.ButtonSymbols.NoButtons)
+        self.workers_spin.setRange(1, os.cpu_count() or 1)
+        self.workers_spin.setValue(1)
         action_controls_layout.addLayout(algo_layout)
+
+        run_options_layout = QHBoxLayout()
+        self.time_budget_label = QLabel("Time Budget (s):")
+        self.time_budget_spin = QDoubleSpinBox()
+        self.time_budget_spin.setButtonSymbols(QAbstractSpinBox.ButtonSymbols.NoButtons)
+        self.time_budget_spin.setRange(0, 600)
+        self.time_budget_spin.setDecimals(1)
+        self.time_budget_spin.setValue(0)
+        self.time_budget_spin.setSpecialValueText("None")
+        run_options_layout.addWidget(self.workers_label)
+        run_options_layout.addWidget(self.workers_spin)
+        run_options_layout.addWidget(self.time_budget_label)
+        run_options_layout.addWidget(self.time_budget_spin)
+        self.seed_label = QLabel("Seed:")
+        self.seed_spin = QSpinBox()
+        self.seed_spin.setButtonSymbols(QAbstractSpinBox.ButtonSymbols.NoButtons)
+        self.seed_spin.setRange(-1, 2 ** 31 - 1)
+        self.seed_spin.setValue(-1)
+        self.seed_spin.setSpecialValueText("Random")
+        run_options_layout.addWidget(self.seed_label)
+        run_options_layout.addWidget(self.seed_spin)
+        self.cache_checkbox = QCheckBox("Cache")
+        self.cache_checkbox.setChecked(True)
+        run_options_layout.addWidget(self.cache_checkbox)
+        # 저장된 답이 있어도 다시 탐색해서 더 좋으면 갱신 (CLI의 --refresh)
+        self.refresh_checkbox = QCheckBox("Refresh")
+        self.refresh_checkbox.setChecked(False)
+        run_options_layout.addWidget(self.refresh_checkbox)
+        action_controls_layout.addLayout(run_options_layout)
         
         self.search_params_group = QGroupBox("Search Parameters")
         self.search_params_group.setFixedHeight(70)
@@ -182,6 +243,10 @@ class App(QWidget):
         self.max_calls_spin.setButtonSymbols(QAbstractSpinBox.ButtonSymbols.NoButtons)
         self.max_calls_spin.setRange(1, 1000000)
         self.max_calls_spin.setValue(100000)
+        self.tt_size_spin = QSpinBox()
+        self.tt_size_spin.setButtonSymbols(QAbstractSpinBox.ButtonSymbols.NoButtons)
+        self.tt_size_spin.setRange(1024, 1 << 26)
+        self.tt_size_spin.setValue(DEFAULT_TT_SIZE)
         self.branches_spin = QSpinBox()
         self.branches_spin.setButtonSymbols(QAbstractSpinBox.ButtonSymbols.NoButtons)
         self.branches_spin.setRange(1, 100)
@@ -196,29 +261,49 @@ class App(QWidget):
         self.guess_limit_spin.setButtonSymbols(QAbstractSpinBox.ButtonSymbols.NoButtons)
         self.guess_limit_spin.setRange(1, 100000)
         self.guess_limit_spin.setValue(10000)
+        self.beam_width_spin = QSpinBox()
+        self.beam_width_spin.setButtonSymbols(QAbstractSpinBox.ButtonSymbols.NoButtons)
+        self.beam_width_spin.setRange(1, 10000)
+        self.beam_width_spin.setValue(20)
+        self.heuristic_dropdown = QComboBox()
+        self.heuristic_dropdown.addItems(list(HEURISTICS))
+        self.heuristic_dropdown.setCurrentText("bound")
         
         self.max_calls_label = QLabel("Max Calls:")
+        self.tt_size_label = QLabel("TT Size:")
         self.branches_label = QLabel("Branches:")
         self.n_iteration_label = QLabel("N Iteration:")
         self.guess_limit_label = QLabel("Guess/Max Iter:")
+        self.beam_width_label = QLabel("Beam Width:")
+        self.heuristic_label = QLabel("Heuristic:")
 
         self.search_params_layout.addWidget(self.max_calls_label, 0, 0)
         self.search_params_layout.addWidget(self.max_calls_spin, 0, 1)
-        self.search_params_layout.addWidget(self.branches_label, 1, 0)
-        self.search_params_layout.addWidget(self.branches_spin, 1, 1)
-        self.search_params_layout.addWidget(self.n_iteration_label, 2, 0)
-        self.search_params_layout.addWidget(self.n_iteration_spin, 2, 1)
-        self.search_params_layout.addWidget(self.guess_limit_label, 3, 0)
-        self.search_params_layout.addWidget(self.guess_limit_spin, 3, 1)
+        self.search_params_layout.addWidget(self.tt_size_label, 1, 0)
+        self.search_params_layout.addWidget(self.tt_size_spin, 1, 1)
+        self.search_params_layout.addWidget(self.branches_label, 2, 0)
+        self.search_params_layout.addWidget(self.branches_spin, 2, 1)
+        self.search_params_layout.addWidget(self.n_iteration_label, 3, 0)
+        self.search_params_layout.addWidget(self.n_iteration_spin, 3, 1)
+        self.search_params_layout.addWidget(self.guess_limit_label, 4, 0)
+        self.search_params_layout.addWidget(self.guess_limit_spin, 4, 1)
+        self.search_params_layout.addWidget(self.beam_width_label, 5, 0)
+        self.search_params_layout.addWidget(self.beam_width_spin, 5, 1)
+        self.search_params_layout.addWidget(self.heuristic_label, 6, 0)
+        self.search_params_layout.addWidget(self.heuristic_dropdown, 6, 1)
         
         action_controls_layout.addWidget(self.search_params_group)
         self.update_search_params("iterative")
 
         self.search_button = QPushButton("Search")
         self.search_button.clicked.connect(self.on_search)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.on_cancel)
+        self.cancel_button.setEnabled(False)
         self.run_button = QPushButton("Run")
         self.run_button.clicked.connect(self.on_run)
         action_controls_layout.addWidget(self.search_button)
+        action_controls_layout.addWidget(self.cancel_button)
         action_controls_layout.addWidget(self.run_button)
         right_panel.addWidget(self.action_controls_frame)
 
@@ -232,6 +317,22 @@ class App(QWidget):
         self.difficulty_slider.setValue(10)
         difficulty_layout.addWidget(self.difficulty_label)
         difficulty_layout.addWidget(self.difficulty_slider)
+        self.rate_label = QLabel("Rate (/s):")
+        self.rate_spin = QSpinBox()
+        self.rate_spin.setButtonSymbols(QAbstractSpinBox.ButtonSymbols.NoButtons)
+        self.rate_spin.setRange(0, 100)
+        self.rate_spin.setValue(0)
+        self.rate_spin.setSpecialValueText("Max")
+        difficulty_layout.addWidget(self.rate_label)
+        difficulty_layout.addWidget(self.rate_spin)
+        # 몇 수마다 화면을 다시 읽어 확인하고, 어긋나면 다시 계획하면서 실행
+        self.verify_checkbox = QCheckBox("Verify")
+        self.verify_checkbox.setChecked(False)
+        difficulty_layout.addWidget(self.verify_checkbox)
+        # 앞 수들을 실행하는 동안 선택한 알고리즘으로 나머지 게임을 계속 다시 탐색
+        self.pipeline_checkbox = QCheckBox("Pipeline")
+        self.pipeline_checkbox.setChecked(False)
+        difficulty_layout.addWidget(self.pipeline_checkbox)
         right_panel.addWidget(difficulty_frame)
         
         top_layout.addLayout(right_panel, 1)
@@ -251,23 +352,30 @@ class App(QWidget):
     def update_search_params(self, algorithm):
         is_exhaustive = (algorithm == 'exhaustive')
         is_h_iteration = (algorithm == 'h-iteration')
-        is_other_iterative = (algorithm in ['r-iteration', 'n-iteration', 'iterative'])
+        is_other_iterative = (algorithm in ['r-iteration', 'n-iteration', 'iterative', 'mcts'])
+        is_beam = (algorithm == 'beam')
 
         self.max_calls_spin.setVisible(is_exhaustive)
         self.max_calls_label.setVisible(is_exhaustive)
+        self.tt_size_spin.setVisible(is_exhaustive)
+        self.tt_size_label.setVisible(is_exhaustive)
         self.branches_spin.setVisible(is_h_iteration)
         self.branches_label.setVisible(is_h_iteration)
         self.n_iteration_spin.setVisible(is_h_iteration)
         self.n_iteration_label.setVisible(is_h_iteration)
         self.guess_limit_spin.setVisible(is_other_iterative)
         self.guess_limit_label.setVisible(is_other_iterative)
+        self.beam_width_spin.setVisible(is_beam)
+        self.beam_width_label.setVisible(is_beam)
+        self.heuristic_dropdown.setVisible(is_beam)
+        self.heuristic_label.setVisible(is_beam)
         
         
-        if is_h_iteration:
-            self.action_controls_frame.setFixedHeight(250)
+        if is_h_iteration or is_exhaustive or is_beam:
+            self.action_controls_frame.setFixedHeight(290)
             self.search_params_group.setFixedHeight(100)
         else:
-            self.action_controls_frame.setFixedHeight(220)
+            self.action_controls_frame.setFixedHeight(260)
             self.search_params_group.setFixedHeight(70)
 
     def apply_theme(self, theme_name):
@@ -281,7 +389,7 @@ class App(QWidget):
             QPushButton:pressed {{ background-color: {theme['button_pressed']}; }}
             QComboBox {{ background-color: {theme['button_bg']}; color: {theme['text']}; border: 1px solid {theme['border']}; padding: 8px; border-radius: 4px; }}
             QComboBox QAbstractItemView {{ background-color: {theme['dropdown_bg']}; color: {theme['text']}; border: 1px solid {theme['border']}; selection-background-color: {theme['accent']}; }}
-            QSpinBox {{ background-color: {theme['button_bg']}; color: {theme['text']}; border: 1px solid {theme['border']}; padding: 8px; border-radius: 4px; }}
+            QSpinBox, QDoubleSpinBox {{ background-color: {theme['button_bg']}; color: {theme['text']}; border: 1px solid {theme['border']}; padding: 8px; border-radius: 4px; }}
             QFrame {{ background-color: {theme['frame_bg']}; border-radius: 8px;}}
             QTextEdit {{ background-color: {theme['frame_bg']}; border: none; color: {theme['text']}; }}
             QGroupBox {{ border: 1px solid {theme['border']}; border-radius: 8px; margin-top: 10px; color: {theme['text']}; }}
@@ -293,7 +401,7 @@ class App(QWidget):
             #action-controls-frame {{background-color: {theme['sub_background']};}}
             #difficulty-frame {{background-color: {theme['sub_background']};}}
             QLabel {{background-color: {theme['third_background']}; border-radius: 8px; border: 1px solid {theme['second_border']};}}
-            QSpinBox::up-button, QSpinBox::down-button {{ background-color: transparent; }}
+            QSpinBox::up-button, QSpinBox::down-button, QDoubleSpinBox::up-button, QDoubleSpinBox::down-button {{ background-color: transparent; }}
         """)
         if self.initial_grid:
             self.scan_grid()
@@ -316,7 +424,12 @@ class App(QWidget):
         for i in reversed(range(self.grid_layout.count())):
             self.grid_layout.itemAt(i).widget().setParent(None)
 
-        self.initial_grid, _, _, self.pos_dict = scan()
+        if self.x_reps:
+            # 칸 위치를 이미 알면 빠른 재스캔 (확신이 낮거나 읽은 보드가 이상하면 rescan이 알아서 전체 스캔)
+            self.initial_grid, self.x_reps, self.y_reps, self.pos_dict = rescan(
+                self.x_reps, self.y_reps, self.pos_dict, previous=self.initial_grid)
+        else:
+            self.initial_grid, self.x_reps, self.y_reps, self.pos_dict = scan()
         send_data(str(self.initial_grid))
 
         if self.initial_grid and any(any(row) for row in self.initial_grid):
@@ -335,6 +448,32 @@ class App(QWidget):
 
         self.best_score_display.setText("Best Score: N/A")
 
+    def search_argument(self, solver_name):
+        """화면의 설정으로 solver_name 솔버의 인자 dict를 만듭니다 (seed 포함)."""
+        argument = {'initial_grid': self.initial_grid}
+        if solver_name == 'exhaustive':
+            argument['max_calls'] = self.max_calls_spin.value()
+            argument['tt_size'] = self.tt_size_spin.value()
+        elif solver_name == 'h-iteration':
+            argument['branches'] = self.branches_spin.value()
+            argument['n_iteration'] = self.n_iteration_spin.value()
+        elif solver_name == 'beam':
+            argument['width'] = self.beam_width_spin.value()
+            argument['heuristic'] = self.heuristic_dropdown.currentText()
+        else:
+            argument['max_iteration' if solver_name in ('r-iteration', 'mcts') else 'guess_limit'] = self.guess_limit_spin.value()
+
+        if self.time_budget_spin.value() > 0:
+            argument['time_budget'] = self.time_budget_spin.value()
+
+        # Random이면 새 seed를 정해 로그에 남김 (그 값을 입력하면 같은 탐색을 재현)
+        seed = self.seed_spin.value()
+        if seed < 0:
+            seed = random.randrange(2 ** 31)
+        print(f"Seed: {seed}")
+        argument['seed'] = seed
+        return argument
+
     def on_search(self):
         if self.initial_grid is None or not any(any(row) for row in self.initial_grid):
             self.status_display.setText("Status: Please perform a successful scan first.")
@@ -342,25 +481,42 @@ class App(QWidget):
 
         self.search_button.setEnabled(False)
         self.run_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
         self.status_display.setText("Status: Searching for solution...")
         
         solver_name = self.algorithm_dropdown.currentText()
         search_func = globals()[f"{solver_name.replace('-', '_')}_solver"]
-        
-        argument = {'initial_grid': self.initial_grid}
-        if solver_name == 'exhaustive':
-            argument['max_calls'] = self.max_calls_spin.value()
-        elif solver_name == 'h-iteration':
-            argument['branches'] = self.branches_spin.value()
-            argument['n_iteration'] = self.n_iteration_spin.value()
-        else:
-            argument['max_iteration' if solver_name == 'r-iteration' else 'guess_limit'] = self.guess_limit_spin.value()
+        argument = self.search_argument(solver_name)
+
+        if self.workers_spin.value() > 1:
+            argument.update(solver=solver_name, workers=self.workers_spin.value())
+            search_func = parallel_solver
+
+        if self.cache_checkbox.isChecked():
+            # 이미 끝까지 푼 보드면 탐색 없이 저장된 최고 답을 바로 씀 (Refresh: 다시 탐색해서 더 좋으면 갱신)
+            search_func = partial(cached_search, self.solution_cache, solver_name, search_func,
+                                  refresh=self.refresh_checkbox.isChecked(), any_seed=self.seed_spin.value() < 0)
 
         self.solver_thread = SolverThread(search_func, argument)
         self.solver_thread.result_ready.connect(self.on_search_complete)
+        self.solver_thread.progress_ready.connect(self.on_search_progress)
         self.solver_thread.finished.connect(self.on_thread_finished)
         self.solver_thread.start()
 
+    def on_search_progress(self, report):
+        self.best_score_display.setText(f"Best Score: {report['best_score']}")
+        if report['best_sequence']:
+            self.last_move_sequence = report['best_sequence']
+        self.status_display.setText(
+            f"Status: Searching... {report['nodes']:,} nodes, "
+            f"{report['nodes_per_sec']:,.0f}/s, {report['elapsed']:.1f}s")
+
+    def on_cancel(self):
+        if self.solver_thread is not None and self.solver_thread.isRunning():
+            self.solver_thread.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_display.setText("Status: Cancelling...")
+
     def on_search_complete(self, max_score, move_sequence):
         self.best_score_display.setText(f"Best Score: {max_score}")
         self.last_move_sequence = move_sequence
@@ -369,18 +525,42 @@ class App(QWidget):
     def on_thread_finished(self):
         self.search_button.setEnabled(True)
         self.run_button.setEnabled(True)
-        if self.status_display.text() == "Status: Searching for solution...":
+        self.cancel_button.setEnabled(False)
+        if self.status_display.text().startswith("Status: Searching"):
             self.status_display.setText("Status: Search finished (no solution found).")
 
     def on_run(self):
+        if self.pipeline_checkbox.isChecked() and self.initial_grid:
+            # 찾아 둔 수순이 있으면 그것부터 실행하고, 없으면 짧게 먼저 탐색한 뒤 실행하면서 계속 다시 탐색
+            self.status_display.setText("Status: Executing moves while searching...")
+            QApplication.processEvents()
+            solver_name = self.algorithm_dropdown.currentText()
+            params = self.search_argument(solver_name)
+            del params['initial_grid']
+            stats = play_pipelined(self.initial_grid, self.x_reps, self.y_reps, self.pos_dict,
+                                   solver=solver_name, params=params, plan=self.last_move_sequence,
+                                   first_time=self.time_budget_spin.value() or 1.0,
+                                   difficulty=self.difficulty_slider.value(), rate=self.rate_spin.value() or None)
+            self.status_display.setText(
+                f"Status: Run complete. {stats['moves']} moves, {stats['improved']} improvements, score {stats['score']}")
+            return
+
         if self.last_move_sequence is None:
             self.status_display.setText("Status: Please run a search first.")
             return
         
         self.status_display.setText("Status: Executing moves...")
         QApplication.processEvents()
-        solve(self.last_move_sequence, self.pos_dict, self.initial_grid, difficulty=self.difficulty_slider.value())
-        self.status_display.setText("Status: Run complete.")
+        if self.verify_checkbox.isChecked():
+            stats = play(self.initial_grid, self.last_move_sequence, self.x_reps, self.y_reps, self.pos_dict,
+                         difficulty=self.difficulty_slider.value(), rate=self.rate_spin.value() or None)
+            self.status_display.setText(
+                f"Status: Run complete. {stats['moves']} moves, {stats['replans']} re-plans, score {stats['score']}")
+            return
+        stats = solve(self.last_move_sequence, self.pos_dict, self.initial_grid,
+                      difficulty=self.difficulty_slider.value(), rate=self.rate_spin.value() or None)
+        self.status_display.setText(
+            f"Status: Run complete. {stats['actions']} moves, {stats['actions_per_sec']:.1f}/s")
 
 def run():
     app = QApplication(sys.argv)
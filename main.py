@@ -1,12 +1,19 @@
 import sys
+import random
+from functools import partial
 
-from search import n_iterative_solver, iterative_solver, r_iteration_solver, h_iteration_solver, exhaustive_solver
-from core import scan, solve, restart_game
-from gui import run as run_gui
+from search import n_iterative_solver, iterative_solver, r_iteration_solver, h_iteration_solver, exhaustive_solver, beam_solver, mcts_solver, DEFAULT_TT_SIZE
+from parallel import parallel_solver
+from core import capture, scan, solve
+from corpus import append_record, iter_records
+from play import play, play_pipelined
+from grind import grind
+from cache import SolutionCache, cached_search
 import time
 
 def main(is_gui):
     if is_gui:
+        from gui import run as run_gui
         run_gui()
     else:
         cli()
@@ -15,9 +22,38 @@ def main(is_gui):
 
 def cli():
 
-    initial_grid, x_reps, y_reps, pos_dict = scan()
+    board_file = sys.argv[sys.argv.index('--board')+1] if '--board' in sys.argv else None
+    record_file = sys.argv[sys.argv.index('--record')+1] if '--record' in sys.argv else None
+    if board_file:
+        # 화면 없이 corpus의 보드들을 재생
+        records = list(iter_records(board_file))
+        if not records:
+            print(f"No boards in {board_file}.")
+            return
+        initial_grid, x_reps, y_reps, pos_dict = records[0]['grid'], [], [], {}
+    elif '--dev' in sys.argv and '--s' in sys.argv:
+        # 벤치마크는 화면 대신 생성한 보드를 씀
+        initial_grid, x_reps, y_reps, pos_dict = [], [], [], {}
+    elif '--grind' in sys.argv:
+        # 연속 플레이는 게임마다 직접 scan
+        initial_grid, x_reps, y_reps, pos_dict = [], [], [], {}
+    elif record_file:
+        screenshot = capture()
+        initial_grid, x_reps, y_reps, pos_dict = scan(screenshot)
+        append_record(record_file, initial_grid, screenshot)
+    else:
+        initial_grid, x_reps, y_reps, pos_dict = scan()
 
     DEV = False
+    tt_size = int(sys.argv[sys.argv.index('--tt')+1]) if '--tt' in sys.argv else DEFAULT_TT_SIZE
+    workers = int(sys.argv[sys.argv.index('--workers')+1]) if '--workers' in sys.argv else 1
+    width = int(sys.argv[sys.argv.index('--width')+1]) if '--width' in sys.argv else 20
+    heuristic = sys.argv[sys.argv.index('--heuristic')+1] if '--heuristic' in sys.argv else 'bound'
+    time_budget = float(sys.argv[sys.argv.index('--time')+1]) if '--time' in sys.argv else None
+    seed = int(sys.argv[sys.argv.index('--seed')+1]) if '--seed' in sys.argv else None
+    rate = float(sys.argv[sys.argv.index('--rate')+1]) if '--rate' in sys.argv else None
+    commit = int(sys.argv[sys.argv.index('--commit')+1]) if '--commit' in sys.argv else 5
+    verify = int(sys.argv[sys.argv.index('--verify')+1]) if '--verify' in sys.argv else None
 
     if '--dev' in sys.argv:
         DEV = True
@@ -27,47 +63,79 @@ def cli():
         iteration = int(sys.argv[sys.argv.index('--s')+1])
     
     if DEV and summary:
-        import openpyxl
-        result = openpyxl.Workbook()
-        output = result.active
-        output.append(['E', 'H', 'R', 'N', 'I'])
-        for _ in range(iteration):
-            print(_)
-            e = exhaustive_solver(initial_grid, 100000)[0]
-            h = h_iteration_solver(initial_grid, 5, 10)[0]
-            r = r_iteration_solver(initial_grid, 10000)[0]
-            n = n_iterative_solver(initial_grid, 10000)[0]
-            i = iterative_solver(initial_grid, 10000)[0]        
-            print(e, h, r, n, i)
-            if e*h*r*n*i == 0:
-                print("t")
-                restart_game()
-                initial_grid, x_reps, y_reps, pos_dict = scan()    
-                continue
-            restart_game()
-            output.append([e, h, r, n, i])
-            initial_grid, x_reps, y_reps, pos_dict = scan()
-
-        result.save(f"./result_{time.time()}.xlsx")
+        # 고정 seed로 만든 보드(또는 --board corpus)에서 모든 솔버를 벤치마크해 JSON으로 저장
+        from benchmark import benchmark, generate_boards
+        seed = seed if seed is not None else 0
+        boards = [record['grid'] for record in records][:iteration] if board_file else generate_boards(iteration, seed)
+        benchmark(boards, seed, out=f"./benchmark_{time.time():.0f}.json")
+        return
 
-    
     if '--exhaustive' in sys.argv or '-e' in sys.argv:
         search_func = exhaustive_solver
-        argument = {'initial_grid': initial_grid, 'max_calls' : 100000}
+        solver_name = 'exhaustive'
+        argument = {'initial_grid': initial_grid, 'max_calls' : 100000, 'tt_size': tt_size}
     elif '--h-iteration' in sys.argv or '-h' in sys.argv:
         search_func = h_iteration_solver
+        solver_name = 'h-iteration'
         argument = {'initial_grid': initial_grid, 'branches': 6, 'n_iteration': 6}
     elif '--r-iteration' in sys.argv or '-r' in sys.argv:
         search_func = r_iteration_solver
+        solver_name = 'r-iteration'
         argument = {'initial_grid': initial_grid, 'max_iteration': 10000}
     elif '--n-iteration' in sys.argv or '-n' in sys.argv:
         search_func = n_iterative_solver
+        solver_name = 'n-iteration'
         argument = {'initial_grid': initial_grid, 'guess_limit': 10000}
     elif '--iterative' in sys.argv or '-i' in sys.argv:
         search_func = iterative_solver
+        solver_name = 'iterative'
         argument = {'initial_grid': initial_grid, 'guess_limit': 10000}
+    elif '--beam' in sys.argv or '-b' in sys.argv:
+        search_func = beam_solver
+        solver_name = 'beam'
+        argument = {'initial_grid': initial_grid, 'width': width, 'heuristic': heuristic}
+    elif '--mcts' in sys.argv or '-m' in sys.argv:
+        search_func = mcts_solver
+        solver_name = 'mcts'
+        argument = {'initial_grid': initial_grid, 'max_iteration': 1000}
     else:
-        print("No search method specified. Use -e, -h, -r, -n, or -i.")
+        print("No search method specified. Use -e, -h, -r, -n, -i, -b, or -m.")
+        return
+
+    if time_budget:
+        argument['time_budget'] = time_budget
+
+    # 같은 seed로 다시 실행하면 같은 결과가 나오도록 항상 seed를 정해서 보여 줌
+    if seed is None:
+        seed = random.randrange(2 ** 31)
+    print(f"Seed: {seed}")
+    argument['seed'] = seed
+
+    if '--pipeline' in sys.argv and not board_file and not DEV and '--grind' not in sys.argv:
+        # 앞 수들을 실행하는 동안 백그라운드에서 나머지 게임을 계속 다시 탐색
+        params = {name: value for (name, value) in argument.items() if name != 'initial_grid'}
+        play_pipelined(initial_grid, x_reps, y_reps, pos_dict, solver=solver_name, params=params, commit=commit,
+                       first_time=time_budget or 1.0, rate=rate)
+        return
+
+    if workers > 1:
+        search_func = parallel_solver
+        argument.update(solver=solver_name, workers=workers)
+
+    # 같은 보드/인자로 끝까지 푼 적이 있으면 탐색 없이 저장된 최고 답을 씀 (--seed가 없으면 seed와 상관없이, --refresh: 다시 탐색해서 더 좋으면 갱신)
+    if '--no-cache' not in sys.argv:
+        search_func = partial(cached_search, SolutionCache(), solver_name, search_func,
+                              refresh='--refresh' in sys.argv, any_seed='--seed' not in sys.argv)
+
+    if '--grind' in sys.argv:
+        games = int(sys.argv[sys.argv.index('--games')+1]) if '--games' in sys.argv else None
+        target = int(sys.argv[sys.argv.index('--target')+1]) if '--target' in sys.argv else None
+        log_path = sys.argv[sys.argv.index('--log')+1] if '--log' in sys.argv else 'grind.jsonl'
+        grind(search_func, argument, games=games, target=target, log_path=log_path, rate=rate, verify=verify)
+        return
+
+    if board_file:
+        replay(records, search_func, argument)
         return
 
     max_score, move_sequence = search_func(**argument)
@@ -75,10 +143,32 @@ def cli():
     print("Move Sequence:")
     for move in move_sequence:
         print(move)
-    if not DEV or execute:
-        solve(move_sequence, pos_dict, initial_grid, difficulty=10)
+    if (not DEV or execute) and verify:
+        play(initial_grid, move_sequence, x_reps, y_reps, pos_dict, check_every=verify, rate=rate)
+    elif not DEV or execute:
+        solve(move_sequence, pos_dict, initial_grid, difficulty=10, rate=rate)
     else:
         print(max_score)
 
+def replay(records, search_func, argument):
+    """corpus의 각 보드를 탐색하고, 원본 화면이 있으면 인식 결과도 저장된 보드와 비교합니다."""
+    scores = []
+    mismatches = 0
+    recognized = 0
+    start = time.perf_counter()
+    for record in records:
+        if record.get('screenshot'):
+            recognized += 1
+            if scan(record['screenshot'])[0] != record['grid']:
+                mismatches += 1
+        max_score, move_sequence = search_func(**dict(argument, initial_grid=record['grid']))
+        scores.append(max_score)
+        print(f"Score: {max_score}")
+    elapsed = time.perf_counter() - start
+    print(f"Boards: {len(scores)}, Mean Score: {sum(scores) / len(scores):.2f}, "
+          f"Min: {min(scores)}, Max: {max(scores)}, Time: {elapsed:.2f}s")
+    if recognized:
+        print(f"Recognition: {recognized - mismatches}/{recognized} boards matched")
+
 if __name__ == "__main__":
     main('-g' in sys.argv)
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import time
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from board import Board
+from search import (MoveIndex, Progress, beam_solver, exhaustive_solver, h_iteration_solver, iterative_solver, mcts_solver,
+                    n_iterative_solver, r_iteration_solver)
+
+SOLVERS = {
+    'exhaustive': exhaustive_solver,
+    'h-iteration': h_iteration_solver,
+    'r-iteration': r_iteration_solver,
+    'n-iteration': n_iterative_solver,
+    'iterative': iterative_solver,
+    'beam': beam_solver,
+    'mcts': mcts_solver,
+}
+
+# 루트 행동을 워커별로 나눠 탐색하는 결정적 솔버와 워커 안에서 나눌 예산 인자(None이면 나누지 않음)
+# 나머지는 워커마다 독립적인 무작위 재시작
+ROOT_SPLIT = {'exhaustive': 'max_calls', 'r-iteration': 'max_iteration'}
+
+# 나눠도 빨라지지 않아 한 프로세스에서 그대로 돌리는 솔버.
+# beam은 결정적이라 무작위 재시작이 의미 없고, 루트 행동마다 전체 폭의 빔을 돌리면 일이 루트 수만큼 늘어남
+SERIAL = {'beam'}
+
+_shared = None  # 워커 프로세스의 공유 최고 점수 (multiprocessing.Value)
+_nodes = None  # 워커들이 탐색한 노드 수 합계 (multiprocessing.Value)
+_cancel = None  # 취소 이벤트 (multiprocessing.Event)
+
+
+class SharedBest:
+    """
+    프로세스 간 공유 최고 점수를 한 하위 보드 기준으로 보여 줍니다.
+    offset은 루트에서 이 하위 보드까지 이미 얻은 점수이고, value에 쓰면 더 클 때만 갱신됩니다.
+    """
+
+    def __init__(self, shared, offset=0):
+        self._shared = shared
+        self.offset = offset
+
+    @property
+    def value(self):
+        return self._shared.value - self.offset
+
+    @value.setter
+    def value(self, score):
+        with self._shared.get_lock():
+            if score + self.offset > self._shared.value:
+                self._shared.value = score + self.offset
+
+
+class _WorkerProgress:
+    """솔버 진행 보고를 받아 공유 노드 수와 공유 최고 점수에 반영하는 워커 쪽 콜백."""
+
+    def __init__(self, offset=0):
+        self.offset = offset
+        self.nodes = 0
+
+    def __call__(self, report):
+        with _nodes.get_lock():
+            _nodes.value += report['nodes'] - self.nodes
+        self.nodes = report['nodes']
+        SharedBest(_shared, self.offset).value = report['best_score']
+
+
+def _init_worker(shared, nodes, cancel):
+    global _shared, _nodes, _cancel
+    _shared = shared
+    _nodes = nodes
+    _cancel = cancel
+
+
+def _root_split_job(job):
+    """할당된 루트 행동마다 하위 보드에서 솔버를 돌리고 가장 좋은 결과를 (점수, 순서)로 반환합니다."""
+    (solver, board, root_moves, params) = job
+    budget_key = ROOT_SPLIT[solver]
+    params = dict(params, cancel=_cancel)
+    if budget_key is not None:
+        params[budget_key] = max(1, params[budget_key] // len(root_moves))
+    end = time.perf_counter() + params['time_budget'] if params.get('time_budget') else None
+    best = (0, [])
+    for i, move in enumerate(root_moves):
+        if end is not None:
+            # 남은 시간을 남은 루트 행동에 고르게 나눔
+            params['time_budget'] = max(0.001, (end - time.perf_counter()) / (len(root_moves) - i))
+        if _cancel.is_set():
+            break
+        child, removed = board.clear(move[0], move[1])
+        if solver == 'exhaustive':
+            params['shared_best'] = SharedBest(_shared, len(removed))
+        params['progress'] = _WorkerProgress(len(removed))
+        (score, sequence) = SOLVERS[solver](child, **params)
+        score += len(removed)
+        if score > best[0]:
+            best = (score, [move] + sequence)
+            SharedBest(_shared).value = score
+    return best
+
+
+def _restart_job(job):
+    (solver, board, params) = job
+    (score, sequence) = SOLVERS[solver](board, progress=_WorkerProgress(), cancel=_cancel, **params)
+    SharedBest(_shared).value = score
+    return score, sequence
+
+
+def _worker_params(params, worker):
+    """seed가 있으면 워커마다 서로 다른 고정 seed(seed + 워커 번호)를 줘서 반복 실행 결과가 같도록 함."""
+    if params.get('seed') is None:
+        return params
+    return dict(params, seed=params['seed'] + worker)
+
+
+def parallel_solver(initial_grid, solver, workers=None, progress=None, cancel=None, **params):
+    """
+    여러 프로세스로 탐색을 나눠 CPU 코어를 모두 쓰는 탐색 함수.
+    - exhaustive, r-iteration: 루트 행동을 워커별로 나눠 각 하위 보드를 탐색 (예산 max_calls/max_iteration은 워커마다 적용)
+    - h-iteration, n-iteration, iterative, mcts: 워커마다 독립적인 무작위 재시작
+    - beam: 나눠도 빨라지지 않으므로 이 프로세스에서 한 번 실행
+    워커들은 지금까지의 최고 점수를 공유하고(exhaustive는 이를 가지치기 기준으로 사용),
+    결과 중 최고를 기존 솔버와 같은 (max_score, move_sequence) 형식으로 반환합니다.
+    progress에는 워커 전체의 노드 수와 공유 최고 점수가 보고되며(best_sequence는 끝날 때만 채워짐),
+    cancel이 설정되면 모든 워커에 전달되어 각자 지금까지의 최고를 반환합니다.
+    seed를 주면 워커 i는 seed + i를 씁니다(exhaustive는 공유 최고 점수로 가지치기하므로 실행마다 다를 수 있음).
+    """
+    print("p")
+    if solver in SERIAL:
+        return SOLVERS[solver](initial_grid, progress=progress, cancel=cancel, **params)
+    workers = workers or os.cpu_count() or 1
+    board = Board.from_grid(initial_grid)
+    if solver in ROOT_SPLIT:
+        root_moves = [(top_left, bottom_right) for (_, top_left, bottom_right) in MoveIndex(board).moves()]
+        if not root_moves:
+            return 0, []
+        chunks = [root_moves[i::workers] for i in range(min(workers, len(root_moves)))]
+        jobs = [(solver, board, chunk, _worker_params(params, i)) for (i, chunk) in enumerate(chunks)]
+        job_func = _root_split_job
+    else:
+        jobs = [(solver, board, _worker_params(params, i)) for i in range(workers)]
+        job_func = _restart_job
+
+    shared = multiprocessing.Value('i', 0)
+    nodes = multiprocessing.Value('q', 0)
+    worker_cancel = multiprocessing.Event()
+    reporter = Progress(progress)
+    with ProcessPoolExecutor(max_workers=len(jobs), initializer=_init_worker,
+                             initargs=(shared, nodes, worker_cancel)) as pool:
+        pending = [pool.submit(job_func, job) for job in jobs]
+        futures = list(pending)
+        while pending:
+            (_, pending) = wait(pending, timeout=reporter.interval, return_when=FIRST_COMPLETED)
+            if cancel is not None and cancel.is_set():
+                worker_cancel.set()
+            reporter.update(nodes.value, shared.value, [])
+        results = [future.result() for future in futures]
+    (max_score, move_sequence) = max(results, key=lambda result: result[0])
+    reporter.finish(nodes.value, max_score, move_sequence)
+    return max_score, list(move_sequence)
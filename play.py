@@ -0,0 +1,142 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from board import Board
+from core import plan_drags, read_cells, rescan, run_drags
+from parallel import SOLVERS
+from search import MoveIndex
+
+
+def _check_cells(moves, n_rows, n_cols):
+    """moves의 직사각형 칸과 그 바깥 한 칸 테두리 (드래그가 빗나가거나 영역이 어긋나면 달라지는 칸)."""
+    cells = set()
+    for ((r1, c1), (r2, c2)) in moves:
+        for r in range(max(0, r1 - 1), min(n_rows, r2 + 2)):
+            for c in range(max(0, c1 - 1), min(n_cols, c2 + 2)):
+                cells.add((r, c))
+    return sorted(cells)
+
+
+def _sequence_score(board, moves):
+    """board에서 moves를 차례로 두었을 때 지워지는 칸 수."""
+    score = 0
+    for (top_left, bottom_right) in moves:
+        board, removed = board.clear(top_left, bottom_right)
+        score += len(removed)
+    return score
+
+
+def _refine(solver, board, params):
+    """백그라운드 프로세스에서 남은 게임을 다시 탐색합니다."""
+    return SOLVERS[solver](board, **params)
+
+
+def play(initial_grid, move_sequence, x_reps, y_reps, pos_dict, check_every=5, difficulty=10, rate=None,
+         replan_solver='beam', replan_params=None, replan_time=0.5, settle=0.1, max_replans=20):
+    """
+    확인하면서 실행하는 닫힌 루프 실행.
+    check_every개 행동마다 드래그한 뒤 settle초 기다리고, 그 행동들의 영역과 테두리 칸만 read_cells로 다시 읽어
+    기대한 보드와 비교합니다. 다르면(드래그를 놓쳤거나 어긋난 경우) 보드 전체를 rescan으로 읽고,
+    그 보드에서 replan_solver(기본 beam, replan_params, 시간 예산 replan_time초)로 남은 행동을 다시 계획합니다.
+    반환: {'moves': 실행한 드래그 수, 'checks': 확인 횟수, 'replans': 재계획 횟수, 'score': 지운 칸 수, 'elapsed': 초}
+    """
+    replan_params = {'width': 10} if replan_params is None else replan_params
+    hold = (10 - difficulty) * 0.08
+    board = Board.from_grid(initial_grid)  # 지금 화면에 있어야 하는 보드
+    start_count = board.count_nonzero()
+    queue = list(move_sequence)
+    stats = {'moves': 0, 'checks': 0, 'replans': 0}
+    start = time.perf_counter()
+    while queue:
+        (chunk, queue) = (queue[:check_every], queue[check_every:])
+        expected = board
+        for (top_left, bottom_right) in chunk:
+            expected, _ = expected.clear(top_left, bottom_right)
+        run_drags(plan_drags(chunk, pos_dict), hold=hold, rate=rate)
+        stats['moves'] += len(chunk)
+
+        time.sleep(settle)
+        cells = _check_cells(chunk, board.n_rows, board.n_cols)
+        observed = read_cells(cells, x_reps, y_reps, pos_dict)
+        stats['checks'] += 1
+        if all(value == expected[r][c] for ((r, c), value) in zip(cells, observed)):
+            board = expected
+            continue
+
+        # 어긋남: 실제 보드를 다시 읽고 거기서 남은 행동을 다시 계획
+        (grid, x_reps, y_reps, pos_dict) = rescan(x_reps, y_reps, pos_dict, previous=board)
+        if not grid:
+            print("Lost the board while verifying, stopping.")
+            break
+        board = Board.from_grid(grid)
+        if stats['replans'] >= max_replans:
+            print("Too many re-plans, stopping.")
+            break
+        stats['replans'] += 1
+        (_, queue) = SOLVERS[replan_solver](board, time_budget=replan_time, **replan_params)
+        print(f"Desync after {stats['moves']} moves, re-planned {len(queue)} moves.")
+
+    stats['score'] = start_count - board.count_nonzero()
+    stats['elapsed'] = time.perf_counter() - start
+    print(f"Played {stats['moves']} moves with {stats['checks']} checks and {stats['replans']} re-plans "
+          f"in {stats['elapsed']:.2f}s (score {stats['score']}).")
+    return stats
+
+
+def play_pipelined(initial_grid, x_reps, y_reps, pos_dict, solver='beam', params=None, plan=None, commit=5,
+                   first_time=1.0, refine_time=None, difficulty=10, rate=None):
+    """
+    탐색과 실행을 겹치는 파이프라인 실행.
+    현재 최고 수순의 앞 commit수를 확정해 드래그하는 동안, 백그라운드 프로세스가 그 수들을 둔 뒤의 보드에서
+    solver(params)로 남은 게임을 다시 탐색합니다. 드래그가 끝나면 새 수순이 기존 남은 수순보다 좋을 때만 바꾸므로
+    이미 둔 수는 바뀌지 않고, 탐색 시간 대부분이 마우스 실행 시간 뒤로 숨습니다.
+    plan이 없으면 처음 수순은 first_time초 예산으로 먼저 탐색합니다.
+    refine_time이 None이면 다시 탐색하는 시간 예산으로 직전 드래그 묶음의 실행 시간을 씁니다.
+    반환: {'moves': 실행한 드래그 수, 'refines': 다시 탐색한 횟수, 'improved': 수순이 바뀐 횟수, 'score': 지운 칸 수,
+           'elapsed': 초}
+    """
+    params = dict(params or {})
+    seed = params.pop('seed', None)
+    params.pop('time_budget', None)
+    hold = (10 - difficulty) * 0.08
+    board = Board.from_grid(initial_grid)
+    start = time.perf_counter()
+    if plan is None:
+        (_, plan) = SOLVERS[solver](board, time_budget=first_time, seed=seed, **params)
+    plan = list(plan)
+    stats = {'moves': 0, 'refines': 0, 'improved': 0, 'score': 0}
+    budget = refine_time or first_time
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        while plan:
+            (chunk, rest) = (plan[:commit], plan[commit:])
+            after = board
+            for (top_left, bottom_right) in chunk:
+                after, removed = after.clear(top_left, bottom_right)
+                stats['score'] += len(removed)
+
+            # 확정한 수들을 둔 뒤의 보드에서 남은 게임을 백그라운드로 다시 탐색
+            # (시간 예산 안에 끝까지 못 간 수순도 여기서 이어 붙음). 둘 수가 없으면 탐색하지 않음
+            future = None
+            if MoveIndex(after).moves():
+                refine_seed = None if seed is None else seed + stats['refines'] + 1
+                future = pool.submit(_refine, solver, after, dict(params, time_budget=budget, seed=refine_seed))
+
+            chunk_start = time.perf_counter()
+            run_drags(plan_drags(chunk, pos_dict), hold=hold, rate=rate)
+            stats['moves'] += len(chunk)
+            if refine_time is None:
+                budget = max(0.05, time.perf_counter() - chunk_start)
+
+            board = after
+            plan = rest
+            if future is not None:
+                (score, sequence) = future.result()
+                stats['refines'] += 1
+                if score > _sequence_score(board, rest):
+                    stats['improved'] += 1
+                    plan = list(sequence)
+
+    stats['elapsed'] = time.perf_counter() - start
+    print(f"Played {stats['moves']} moves with {stats['refines']} refinements ({stats['improved']} improved) "
+          f"in {stats['elapsed']:.2f}s (score {stats['score']}).")
+    return stats
@@ -1,12 +1,384 @@
+import heapq
+import math
 import random
-from util import contain_or_adjacent_to_zero
+import time
+from array import array
+from functools import lru_cache
+from board import Board
+from catalog import rect_catalog
+from util import contain_or_adjacent_to_zero_batch
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 이동 생성 엔진: NumPy가 있으면 벡터화 버전, 없으면 순수 파이썬 증분 인덱스
+ENGINE = 'numpy' if np is not None else 'python'
+
+_NP_AXES = {}
+_ZOBRIST = {}
+
+# exhaustive_solver 치환표 기본 크기(버킷 수)
+DEFAULT_TT_SIZE = 1 << 20
+
+
+class Deadline:
+    """
+    솔버의 시간 예산(초). time_budget이 None이나 0이면 만료되지 않습니다.
+    cancel(threading.Event 등 is_set()이 있는 객체)이 설정되어도 만료로 봅니다(협조적 취소).
+    expired()는 시계 한 번 읽는 정도라 메인 루프에서 매번 불러도 됩니다. 한 번 만료되면 계속 만료 상태입니다.
+    """
+
+    def __init__(self, time_budget=None, cancel=None):
+        self.end = time.perf_counter() + time_budget if time_budget else None
+        self.cancel = cancel
+        self._expired = False
+
+    def expired(self):
+        if self._expired:
+            return True
+        if self.cancel is not None and self.cancel.is_set():
+            self._expired = True
+        elif self.end is not None:
+            self._expired = time.perf_counter() >= self.end
+        return self._expired
+
+    def remaining(self):
+        if self.end is None:
+            return None
+        return max(0.0, self.end - time.perf_counter())
+
+
+class Progress:
+    """
+    진행 상황 보고. update()는 메인 루프에서 매번 불러도 되고, callback은 interval초에 한 번만 호출됩니다.
+    callback에는 dict(nodes, nodes_per_sec, best_score, best_sequence, elapsed)가 전달됩니다.
+    finish()는 간격과 상관없이 마지막 상태를 한 번 보고합니다.
+    materialize가 있으면 best_sequence를 보고할 때만 그것으로 펼칩니다(부모 포인터 경로 등).
+    """
+
+    def __init__(self, callback=None, interval=0.25, materialize=None):
+        self.callback = callback
+        self.interval = interval
+        self.materialize = materialize or list
+        self.start = time.perf_counter()
+        self._next = self.start + interval
+
+    def update(self, nodes, best_score, best_sequence):
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        if now >= self._next:
+            self._next = now + self.interval
+            self._emit(now, nodes, best_score, best_sequence)
+
+    def finish(self, nodes, best_score, best_sequence):
+        if self.callback is not None:
+            self._emit(time.perf_counter(), nodes, best_score, best_sequence)
+
+    def _emit(self, now, nodes, best_score, best_sequence):
+        elapsed = now - self.start
+        self.callback({
+            'nodes': int(nodes),
+            'nodes_per_sec': nodes / elapsed if elapsed > 0 else 0.0,
+            'best_score': best_score,
+            'best_sequence': self.materialize(best_sequence),
+            'elapsed': elapsed,
+        })
+
+
+class MoveIndex:
+    """
+    증분 이동 인덱스.
+    모든 직사각형의 합을 들고 있다가 영역을 지울 때 그 칸을 덮는 직사각형의 합만 갱신하고,
+    합이 10인 직사각형 집합(tens)을 유지합니다. 되돌리기(undo)로 백트래킹을 지원합니다.
+    moves()는 find_all_sum_10_areas와 같은 결과를 돌려줍니다.
+    engine='numpy'(기본값, NumPy가 있을 때)이면 합 테이블 없이 moves()마다 벡터화 계산을 합니다.
+    현재 상태는 불변 Board(self.board)로 들고 있으므로 copy()는 보드를 공유합니다.
+    """
+
+    def __init__(self, grid, engine=None):
+        self.board = Board.from_grid(grid)
+        self.n_rows = self.board.n_rows
+        self.n_cols = self.board.n_cols
+        self.engine = engine or ENGINE
+        if self.engine == 'numpy':
+            # NumPy 엔진은 moves()마다 전체를 벡터화 계산하므로 합 테이블을 유지하지 않음
+            self.rects = self.cover = self.sums = self.tens = None
+            return
+        catalog = rect_catalog(self.n_rows, self.n_cols)
+        self.rects, self.cover = catalog.rects, catalog.cover
+
+        n_cols = self.n_cols
+        cells = self.board.cells
+        ps = [[0] * (n_cols + 1) for _ in range(self.n_rows + 1)]
+        for i in range(self.n_rows):
+            for j in range(n_cols):
+                ps[i + 1][j + 1] = cells[i * n_cols + j] + ps[i][j + 1] + ps[i + 1][j] - ps[i][j]
+        self.sums = [ps[r2 + 1][c2 + 1] - ps[r1][c2 + 1] - ps[r2 + 1][c1] + ps[r1][c1]
+                     for (r1, c1, r2, c2) in self.rects]
+        self.tens = {rid for rid, s in enumerate(self.sums) if s == 10}
+
+    def copy(self):
+        other = MoveIndex.__new__(MoveIndex)
+        other.board = self.board
+        other.n_rows = self.n_rows
+        other.n_cols = self.n_cols
+        other.engine = self.engine
+        other.rects = self.rects
+        other.cover = self.cover
+        if self.sums is None:
+            other.sums = other.tens = None
+        else:
+            other.sums = self.sums[:]
+            other.tens = set(self.tens)
+        return other
+
+    def apply(self, top_left, bottom_right):
+        """영역을 0으로 만들고 지운 칸 목록 [(r, c, value), ...]을 반환합니다. 점수는 len(반환값)."""
+        removed = self.clear(top_left, bottom_right)
+        self.commit(removed)
+        return removed
+
+    def clear(self, top_left, bottom_right):
+        """보드만 0으로 만듭니다. 합 테이블은 commit을 호출해야 반영됩니다."""
+        self.board, removed = self.board.clear(top_left, bottom_right)
+        return removed
+
+    def commit(self, removed):
+        """clear로 지운 칸을 덮는 직사각형의 합만 갱신합니다."""
+        if self.sums is None:
+            return
+        sums, tens, cover, n_cols = self.sums, self.tens, self.cover, self.n_cols
+        for (r, c, v) in removed:
+            was_ten = 10 - v
+            for rid in cover[r * n_cols + c]:
+                s = sums[rid] - v
+                sums[rid] = s
+                if s == 10:
+                    tens.add(rid)
+                elif s == was_ten:
+                    tens.discard(rid)
+
+    def undo(self, removed, committed=True):
+        """apply(또는 clear)가 반환한 목록으로 지운 칸을 되돌립니다."""
+        self.board = self.board.restore(removed)
+        if self.sums is None or not committed:
+            return
+        sums, tens, cover, n_cols = self.sums, self.tens, self.cover, self.n_cols
+        for (r, c, v) in reversed(removed):
+            was_ten = 10 + v
+            for rid in cover[r * n_cols + c]:
+                s = sums[rid] + v
+                sums[rid] = s
+                if s == 10:
+                    tens.add(rid)
+                elif s == was_ten:
+                    tens.discard(rid)
+
+    def moves(self):
+        """현재 상태에서 합이 10인 영역을 find_all_sum_10_areas와 같은 형식/순서로 반환합니다."""
+        if self.engine == 'numpy':
+            moves, priorities = find_sum_10_moves_np(self.board)
+            return _as_tuples(moves, priorities)
+        found = []
+        if not self.tens:
+            return found
+        n_rows, n_cols, cells, rects = self.n_rows, self.n_cols, self.board.cells, self.rects
+        pc = [[0] * (n_cols + 1) for _ in range(n_rows + 1)]  # priority 누적합(0 또는 1 카운트)
+        for i in range(n_rows):
+            base = i * n_cols
+            for j in range(n_cols):
+                is_priority = 1 if cells[base + j] <= 1 else 0
+                pc[i + 1][j + 1] = is_priority + pc[i][j + 1] + pc[i + 1][j] - pc[i][j]
+        for rid in sorted(self.tens):
+            (r1, c1, r2, c2) = rects[rid]
+            priority = pc[r2 + 1][c2 + 1] - pc[r1][c2 + 1] - pc[r2 + 1][c1] + pc[r1][c1]
+            found.append((priority, (r1, c1), (r2, c2)))
+        found.sort(key=lambda x: (x[0], -((x[2][1] - x[1][1] + 1) * (x[2][0] - x[1][0] + 1))))
+        return found
+
+
+def _path_moves(path, moves):
+    """
+    부모 포인터 경로를 [(top_left, bottom_right), ...]로 펼칩니다.
+    경로는 (직사각형 번호(RectCatalog의 rid), 부모 경로) 튜플로 이어진 연결 리스트이고 빈 경로는 None입니다.
+    자식 경로는 튜플 하나로 O(1)에 만들어지고 형제끼리 부모 경로를 공유하므로,
+    탐색 중에는 경로를 복사하지 않고 최종 결과(또는 진행 보고)에서만 펼칩니다.
+    """
+    sequence = []
+    while path is not None:
+        (rid, path) = path
+        sequence.append(moves[rid])
+    sequence.reverse()
+    return sequence
+
+
+def _expand(entry):
+    """
+    스택 항목 (부모 인덱스, 적용할 행동, 경로, 부모 점수)을 실제 상태로 펼칩니다.
+    자식 상태는 꺼낼 때 한 번만 만들어지므로, 형제 노드들은 부모 인덱스를 공유합니다.
+    """
+    (index, move, path, score) = entry
+    if move is None:
+        return index, path, score
+    child = index.copy()
+    removed = child.apply(move[0], move[1])
+    return child, path, score + len(removed)
+
+
+def _zobrist_keys(n_cells):
+    """
+    칸 수별 Zobrist 키 테이블. keys[cell * 10 + value]는 (칸, 값) 쌍의 64비트 난수이고 값 0의 키는 0입니다.
+    base는 모든 칸이 0인 보드의 해시(치환표에서 빈 슬롯 0과 구분하기 위한 값)입니다.
+    """
+    table = _ZOBRIST.get(n_cells)
+    if table is None:
+        rng = random.Random(n_cells)  # 실행마다 같은 키
+        keys = [0] * (n_cells * 10)
+        for i in range(n_cells * 10):
+            if i % 10:
+                keys[i] = rng.getrandbits(64)
+        base = rng.getrandbits(64) | 1
+        table = _ZOBRIST[n_cells] = (keys, base)
+    return table
+
+
+def zobrist_hash(board):
+    """Board 전체의 Zobrist 해시. 탐색 중에는 지운 칸의 키만 XOR해서 증분 갱신합니다."""
+    keys, h = _zobrist_keys(board.n_rows * board.n_cols)
+    for i, v in enumerate(board.cells):
+        h ^= keys[i * 10 + v]
+    return h
+
+
+class TranspositionTable:
+    """
+    고정 크기 치환표. 메모리는 size에 비례해 처음에 한 번만 잡습니다(버킷당 약 24바이트).
+    버킷마다 슬롯 두 개를 둡니다.
+    - 슬롯 0 (depth-preferred): 더 얕은(루트에 가까운, 아래 서브트리가 큰) 상태를 우선 보관
+    - 슬롯 1 (always-replace): 밀려난 항목이나 깊은 상태를 항상 덮어씀
+    """
+
+    def __init__(self, size=DEFAULT_TT_SIZE):
+        n_buckets = 1
+        while n_buckets < size:
+            n_buckets <<= 1
+        self.mask = n_buckets - 1
+        self.keys = array('Q', bytes(16 * n_buckets))
+        self.scores = array('H', bytes(4 * n_buckets))
+        self.depths = array('H', bytes(4 * n_buckets))
+
+    def probe(self, h):
+        """저장된 점수를 반환합니다. 없으면 None."""
+        slot = (h & self.mask) << 1
+        keys = self.keys
+        if keys[slot] == h:
+            return self.scores[slot]
+        if keys[slot + 1] == h:
+            return self.scores[slot + 1]
+        return None
+
+    def store(self, h, score, depth):
+        slot = (h & self.mask) << 1
+        keys, scores, depths = self.keys, self.scores, self.depths
+        if keys[slot] == h or keys[slot] == 0 or depth <= depths[slot]:
+            if keys[slot] != h and keys[slot] != 0:
+                # 밀려난 항목은 always-replace 슬롯으로
+                keys[slot + 1] = keys[slot]
+                scores[slot + 1] = scores[slot]
+                depths[slot + 1] = depths[slot]
+        else:
+            slot += 1
+        keys[slot] = h
+        scores[slot] = score
+        depths[slot] = depth
+
 
 def find_all_sum_10_areas(result):
     """
     모든 (임의 크기) 직사각형에 대해 합이 10인 영역을 찾아 반환합니다.
-    빠른 합 계산을 위해 2D 누적합(prefix sum)을 사용합니다.
     반환 형식: [(priority, (r1,c1), (r2,c2)), ...]
     priority는 해당 영역 내에 값이 0 또는 1인 칸의 개수(원래 코드 의미와 동일).
+    ENGINE이 'numpy'이면 find_sum_10_moves_np를, 아니면 순수 파이썬 버전을 사용합니다.
+    """
+    if ENGINE == 'numpy':
+        moves, priorities = find_sum_10_moves_np(result)
+        return _as_tuples(moves, priorities)
+    return _find_all_sum_10_areas_py(result)
+
+
+def _np_axes(n_rows, n_cols):
+    """
+    (r1, r2, c1, c2) 브로드캐스팅용 축 배열을 크기별로 캐시합니다.
+    valid는 r1<=r2, c1<=c2인 칸의 평탄화 위치(탐색 순서 그대로), bounds는 그 직사각형들의 [r1, c1, r2, c2].
+    """
+    key = (n_rows, n_cols)
+    axes = _NP_AXES.get(key)
+    if axes is None:
+        r1 = np.arange(n_rows)[:, None, None, None]
+        r2 = np.arange(n_rows)[None, :, None, None]
+        c1 = np.arange(n_cols)[None, None, :, None]
+        c2 = np.arange(n_cols)[None, None, None, :]
+        valid = np.flatnonzero(((r1 <= r2) & (c1 <= c2)).ravel())
+        top, bottom, left, right = (x.ravel()[valid] for x in np.broadcast_arrays(r1, r2, c1, c2))
+        bounds = np.stack((top, left, bottom, right), axis=1)
+        axes = _NP_AXES[key] = (r1, r2, c1, c2, valid, bounds)
+    return axes
+
+
+def find_sum_10_moves_np(result):
+    """
+    find_all_sum_10_areas의 NumPy 벡터화 버전.
+    cumsum으로 누적합을 만들고 모든 (r1, r2, c1, c2) 직사각형의 합을 브로드캐스팅으로 한 번에 계산합니다.
+    반환: (moves, priorities) — moves는 (k, 4) 배열 [r1, c1, r2, c2], priorities는 (k,) 배열.
+    정렬 순서는 find_all_sum_10_areas와 같습니다(priority 오름차순, 면적 내림차순, 그 외 탐색 순서).
+    """
+    if isinstance(result, Board):
+        grid = result.array().astype(np.int32)
+    else:
+        grid = np.asarray(result, dtype=np.int32)
+    if grid.ndim != 2 or grid.size == 0:
+        return np.zeros((0, 4), dtype=np.intp), np.zeros(0, dtype=np.int32)
+    n_rows, n_cols = grid.shape
+    r1, r2, c1, c2, valid, bounds = _np_axes(n_rows, n_cols)
+
+    ps = np.zeros((n_rows + 1, n_cols + 1), dtype=np.int32)
+    ps[1:, 1:] = grid.cumsum(axis=0).cumsum(axis=1)
+    sums = ps[r2 + 1, c2 + 1] - ps[r1, c2 + 1] - ps[r2 + 1, c1] + ps[r1, c1]
+    moves = bounds[np.flatnonzero(sums.ravel()[valid] == 10)]
+    top, left, bottom, right = moves.T
+
+    pc = np.zeros((n_rows + 1, n_cols + 1), dtype=np.int32)
+    pc[1:, 1:] = (grid <= 1).cumsum(axis=0).cumsum(axis=1)
+    priorities = pc[bottom + 1, right + 1] - pc[top, right + 1] - pc[bottom + 1, left] + pc[top, left]
+    areas = (bottom - top + 1) * (right - left + 1)
+
+    # lexsort는 안정 정렬이므로 동률에서는 (r1, r2, c1, c2) 탐색 순서가 유지됨
+    order = np.lexsort((-areas, priorities))
+    return moves[order], priorities[order]
+
+
+def _as_tuples(moves, priorities):
+    """NumPy 결과 배열을 [(priority, (r1,c1), (r2,c2)), ...] 형식으로 바꿉니다."""
+    return [(p, (r1, c1), (r2, c2)) for (p, (r1, c1, r2, c2)) in zip(priorities.tolist(), moves.tolist())]
+
+
+def check_engines(result):
+    """NumPy 엔진과 순수 파이썬 엔진이 같은 이동 목록을 내는지 확인합니다."""
+    expected = _find_all_sum_10_areas_py(result)
+    if np is None:
+        return True
+    moves, priorities = find_sum_10_moves_np(result)
+    actual = _as_tuples(moves, priorities)
+    return actual == expected
+
+
+def _find_all_sum_10_areas_py(result):
+    """
+    순수 파이썬 버전(NumPy가 없을 때의 대체 경로 겸 기준 구현).
+    빠른 합 계산을 위해 2D 누적합(prefix sum)을 사용합니다.
     """
     found = []
     n_rows = len(result)
@@ -41,161 +413,160 @@ def find_all_sum_10_areas(result):
     return found
 
 
-def n_iterative_solver(initial_grid, guess_limit):
+def n_iterative_solver(initial_grid, guess_limit, time_budget=None, progress=None, cancel=None, seed=None):
     print("n")
+    deadline = Deadline(time_budget, cancel)
+    random_gen = random.Random(seed)
     max_score = 0
-    best_move_sequence = []
-    stack = [(initial_grid, [], 0)]
+    best_path = None
+    root = MoveIndex(initial_grid)
+    catalog = rect_catalog(root.n_rows, root.n_cols)
+    (rect_moves, rect_ids) = (catalog.moves, catalog.ids)
+    reporter = Progress(progress, materialize=lambda path: _path_moves(path, rect_moves))
+    stack = [(root, None, None, 0)]
     iteration = 0
-    while iteration < guess_limit:
+    while iteration < guess_limit and not deadline.expired():
+        reporter.update(iteration, max_score, best_path)
         if len(stack) == 0:
-            stack = [(initial_grid, [], 0)]
-        (current_grid, move_sequence, current_score) = stack.pop()
-        available_action = find_all_sum_10_areas(current_grid)
-        if random.randint(0, 9) * iteration % 10 <= 2:
+            stack = [(root, None, None, 0)]
+        entry = stack.pop()
+        if random_gen.randint(0, 9) * iteration % 10 <= 2:
             iteration += 0.25
             continue
+        (index, path, current_score) = _expand(entry)
+        available_action = index.moves()
         if not available_action:
             if current_score > max_score:
                 max_score = current_score
-                best_move_sequence = move_sequence
-                stack = stack[:len(stack) - min(random.randint(1, 5 ** 5), len(stack)) + 1]
+                best_path = path
+                stack = stack[:len(stack) - min(random_gen.randint(1, 5 ** 5), len(stack)) + 1]
             iteration += 1
             continue
-        possible_actions = [action for action in available_action if
-                            contain_or_adjacent_to_zero(current_grid, action[1], action[2])]
+        near_zero = contain_or_adjacent_to_zero_batch(index.board, available_action)
+        possible_actions = [action for (action, near) in zip(available_action, near_zero) if near]
         if not possible_actions:
             possible_actions = available_action
         possible_actions.sort(key=lambda x: (x[0]))
         for (priority, top_left, bottom_right) in possible_actions[:5]:
-            new_grid = [row[:] for row in current_grid]
-            (r1, c1) = top_left
-            (r2, c2) = bottom_right
-            add_score = 0
-            for r in range(r1, r2 + 1):
-                for c in range(c1, c2 + 1):
-                    if new_grid[r][c] != 0:
-                        add_score += 1
-                    new_grid[r][c] = 0
-            new_move_sequence = move_sequence + [(top_left, bottom_right)]
-            new_score = current_score + add_score
-            stack.append((new_grid, new_move_sequence, new_score))
+            move = (top_left, bottom_right)
+            stack.append((index, move, (rect_ids[move], path), current_score))
         iteration += 1
-    return max_score, best_move_sequence
+    reporter.finish(iteration, max_score, best_path)
+    return max_score, _path_moves(best_path, rect_moves)
 
 
-def iterative_solver(initial_grid, guess_limit):
+def iterative_solver(initial_grid, guess_limit, time_budget=None, progress=None, cancel=None, seed=None):
     print("_")
+    deadline = Deadline(time_budget, cancel)
+    random_gen = random.Random(seed)
     max_score = 0
-    best_move_sequence = []
-    stack = [(initial_grid, [], 0)]
+    best_path = None
+    root = MoveIndex(initial_grid)
+    catalog = rect_catalog(root.n_rows, root.n_cols)
+    (rect_moves, rect_ids) = (catalog.moves, catalog.ids)
+    reporter = Progress(progress, materialize=lambda path: _path_moves(path, rect_moves))
+    emergency_action = root.moves()
+    if not emergency_action:
+        reporter.finish(0, 0, None)
+        return 0, []
+    stack = [(root, None, None, 0)]
     iteration = 0
-    while iteration < guess_limit:
+    while iteration < guess_limit and not deadline.expired():
+        reporter.update(iteration, max_score, best_path)
         if len(stack) == 0:
-            stack = [(initial_grid, [], 0)]
-        (current_grid, move_sequence, current_score) = stack.pop()
-        available_action = find_all_sum_10_areas(current_grid)
+            stack = [(root, None, None, 0)]
+        (index, path, current_score) = _expand(stack.pop())
+        available_action = index.moves()
         if not available_action:
             if current_score < 100:
-                emergency_action = find_all_sum_10_areas(initial_grid)
-                k = random.randint(0, len(emergency_action) - 1)
-                (top_left, bottom_right) = emergency_action[k][1], emergency_action[k][2]
-                current_grid = initial_grid
-                new_grid = [row[:] for row in current_grid]
-                (r1, c1) = top_left
-                (r2, c2) = bottom_right
-                add_score = 0
-                for r in range(r1, r2 + 1):
-                    for c in range(c1, c2 + 1):
-                        if new_grid[r][c] != 0:
-                            add_score += 1
-                        new_grid[r][c] = 0
-                new_move_sequence = [(top_left, bottom_right)]
-                new_score = add_score
-                stack = [(new_grid, new_move_sequence, new_score)]  # ← 수정됨
+                # 점수가 낮은 끝은 처음부터 다시 시작하지만, 남은 칸이 적은 보드(실행 중 다시 탐색)에서는
+                # 100점에 못 미치는 게 보통이므로 최고 기록은 남김
+                if current_score > max_score:
+                    max_score = current_score
+                    best_path = path
+                k = random_gen.randint(0, len(emergency_action) - 1)
+                move = (emergency_action[k][1], emergency_action[k][2])
+                stack = [(root, move, (rect_ids[move], None), 0)]  # ← 수정됨
                 iteration += 1
                 continue
             if current_score > max_score:
                 max_score = current_score
-                best_move_sequence = move_sequence
-                for i in range(1, min(random.randint(1, 5 ** 3), len(stack))):
+                best_path = path
+                for i in range(1, min(random_gen.randint(1, 5 ** 3), len(stack))):
                     stack.pop()
             iteration += 1
             continue
-        possible_actions = [action for action in available_action if
-                            contain_or_adjacent_to_zero(current_grid, action[1], action[2])]
+        near_zero = contain_or_adjacent_to_zero_batch(index.board, available_action)
+        possible_actions = [action for (action, near) in zip(available_action, near_zero) if near]
         if not possible_actions:
             possible_actions = available_action
         possible_actions.sort(key=lambda x: (x[0]))
         for (priority, top_left, bottom_right) in possible_actions[:8]:
-            new_grid = [row[:] for row in current_grid]
-            (r1, c1) = top_left
-            (r2, c2) = bottom_right
-            add_score = 0
-            for r in range(r1, r2 + 1):
-                for c in range(c1, c2 + 1):
-                    if new_grid[r][c] != 0:
-                        add_score += 1
-                    new_grid[r][c] = 0
-            new_move_sequence = move_sequence + [(top_left, bottom_right)]
-            new_score = current_score + add_score
-            stack.append((new_grid, new_move_sequence, new_score))  # ← 수정됨
+            move = (top_left, bottom_right)
+            stack.append((index, move, (rect_ids[move], path), current_score))  # ← 수정됨
         iteration += 1
-    return max_score, best_move_sequence
+    reporter.finish(iteration, max_score, best_path)
+    return max_score, _path_moves(best_path, rect_moves)
 
 
-def r_iteration_solver(initial_grid, max_iteration):
+def r_iteration_solver(initial_grid, max_iteration, time_budget=None, progress=None, cancel=None, seed=None):
+    # 무작위를 쓰지 않는 결정적 탐색이므로 seed는 다른 솔버와 인자를 맞추기 위해서만 받음
     print("r")
+    deadline = Deadline(time_budget, cancel)
     max_score = 0
-    best_move_sequence = []
-    stack = [(initial_grid, [], 0)]
+    best_path = None
+    root = MoveIndex(initial_grid)
+    catalog = rect_catalog(root.n_rows, root.n_cols)
+    (rect_moves, rect_ids) = (catalog.moves, catalog.ids)
+    reporter = Progress(progress, materialize=lambda path: _path_moves(path, rect_moves))
+    stack = [(root, None, None, 0)]
     iteration = 0
-    while stack and iteration < max_iteration:
-        current_grid, move_sequence, current_score = stack.pop()
-        available_action = find_all_sum_10_areas(current_grid)
+    while stack and iteration < max_iteration and not deadline.expired():
+        reporter.update(iteration, max_score, best_path)
+        index, path, current_score = _expand(stack.pop())
+        available_action = index.moves()
         if not available_action:
             if current_score > max_score:
                 max_score = current_score
-                best_move_sequence = move_sequence
+                best_path = path
             iteration += 1
             continue
         for (_, top_left, bottom_right) in available_action:
-            new_grid = [row[:] for row in current_grid]
-            r1, c1 = top_left
-            r2, c2 = bottom_right
-            add_score = 0
-            for r in range(r1, r2 + 1):
-                for c in range(c1, c2 + 1):
-                    if new_grid[r][c] != 0:
-                        add_score += 1
-                    new_grid[r][c] = 0
-            new_move_sequence = move_sequence + [(top_left, bottom_right)]
-            new_score = current_score + add_score
-            stack.append((new_grid, new_move_sequence, new_score))
+            move = (top_left, bottom_right)
+            stack.append((index, move, (rect_ids[move], path), current_score))
         iteration += 1
-    return max_score, best_move_sequence
+    reporter.finish(iteration, max_score, best_path)
+    return max_score, _path_moves(best_path, rect_moves)
 
 
-def h_iteration_solver(initial_grid, branches, n_iteration):
+def h_iteration_solver(initial_grid, branches, n_iteration, time_budget=None, progress=None, cancel=None, seed=None):
     """
     휴리스틱 탐색 함수 (hybrid random + priority).
     - initial_grid: 시작 그리드
     - max_iteration: 전체 행동(노드 처리) 제한
     - branches: 분화 시 생성할 분기 수
     - n_iteration: 분화 빈도(몇 번 진행할 때마다 분화할지)
+    - time_budget: 시간 예산(초). 지나면 진행 중인 경로까지만 마치고 지금까지의 최고를 반환
+    - progress: 진행 상황 콜백(Progress 참고), cancel: 설정되면 멈추는 이벤트(Deadline 참고)
+    - seed: 분기 섞기에 쓰는 난수 seed. 같은 seed면 (시간 예산이 없을 때) 같은 결과
 
     동작 요약:
     1) 현재 상태에서 우선순위에 따라 한 가지 후보만 고르고 계속 전개한다.
     2) steps가 n_iteration마다(즉 일정 간격마다) 분화 시점이 되어야 하면 가능한 액션들을 섞어 최대 branches개를 스택에 넣어 다른 경로들을 나중에 탐색하도록 한다.
     3) 분화할 때도 현재 경로는 그중 하나를 선택하여 즉시 계속 전개한다.
-    4) 가능한 액션 선택 시에는 contain_or_adjacent_to_zero 필터를 우선 적용한다(없으면 전체 사용).
+    4) 가능한 액션 선택 시에는 0 포함/인접 필터(contain_or_adjacent_to_zero_batch)를 우선 적용한다(없으면 전체 사용).
     """
     print("h")
+    deadline = Deadline(time_budget, cancel)
     max_score = 0
-    best_move_sequence = []
-    stack = [(initial_grid, [], 0)]
+    best_path = None
+    root = MoveIndex(initial_grid)
+    catalog = rect_catalog(root.n_rows, root.n_cols)
+    (rect_moves, rect_ids) = (catalog.moves, catalog.ids)
+    reporter = Progress(progress, materialize=lambda path: _path_moves(path, rect_moves))
+    stack = [(root, None, None, 0)]
     iteration = 0
-    random_gen = random.Random()
+    random_gen = random.Random(seed)
 
     # 안전한 기본값
     if branches < 1:
@@ -203,26 +574,25 @@ def h_iteration_solver(initial_grid, branches, n_iteration):
     if n_iteration < 1:
         n_iteration = 10
 
-    # 메인 루프: 스택이 비거나 iteration 초과 시 종료
-    while stack:
-        current_grid, move_sequence, current_score = stack.pop()
-        # 각 스택 항목마다 한 경로를 휴리스틱하게 전개
+    # 메인 루프: 스택이 비거나 시간 예산을 넘기면 종료
+    while stack and not deadline.expired():
+        reporter.update(iteration, max_score, best_path)
+        # 각 스택 항목마다 한 경로를 휴리스틱하게 전개 (펼친 인덱스는 이 경로 전용이므로 제자리 갱신)
+        index, path, score = _expand(stack.pop())
         steps = 0
-        grid = [row[:] for row in current_grid]
-        seq = move_sequence[:]
-        score = current_score
 
         while True:
-            available_action = find_all_sum_10_areas(grid)
+            available_action = index.moves()
             if not available_action:
                 # 종료 상태: 점수 갱신
                 if score > max_score:
                     max_score = score
-                    best_move_sequence = seq[:]
+                    best_path = path
                 break
 
             # 가능한 액션에 대해 0 인접성 필터 적용
-            possible_actions = [action for action in available_action if contain_or_adjacent_to_zero(grid, action[1], action[2])]
+            near_zero = contain_or_adjacent_to_zero_batch(index.board, available_action)
+            possible_actions = [action for (action, near) in zip(available_action, near_zero) if near]
             if not possible_actions:
                 possible_actions = available_action[:]
 
@@ -236,20 +606,11 @@ def h_iteration_solver(initial_grid, branches, n_iteration):
                 # 제한: branches보다 적을 수 있음
                 chosen_for_stack = shuffled[:min(branches, len(shuffled))]
 
+                # 분기들은 현재 상태의 스냅샷 하나를 공유하고, 꺼낼 때 각자 행동을 적용
+                snapshot = index.copy()
                 for (priority, top_left, bottom_right) in chosen_for_stack:
-                    # 각 분기별로 새로운 그리드 계산하여 스택에 넣음
-                    new_grid = [row[:] for row in grid]
-                    (r1, c1) = top_left
-                    (r2, c2) = bottom_right
-                    add_score = 0
-                    for r in range(r1, r2 + 1):
-                        for c in range(c1, c2 + 1):
-                            if new_grid[r][c] != 0:
-                                add_score += 1
-                            new_grid[r][c] = 0
-                    new_move_sequence = seq + [(top_left, bottom_right)]
-                    new_score = score + add_score
-                    stack.append((new_grid, new_move_sequence, new_score))
+                    move = (top_left, bottom_right)
+                    stack.append((snapshot, move, (rect_ids[move], path), score))
                     iteration += 1
                 # 현재 경로는 우선순위 기반으로 하나만 선택해서 계속 진행
                 possible_actions.sort(key=lambda x: (x[0]))
@@ -261,36 +622,101 @@ def h_iteration_solver(initial_grid, branches, n_iteration):
 
             # 선택된 행동을 현재 경로에 적용
             (_, top_left, bottom_right) = chosen
-            new_grid = [row[:] for row in grid]
-            (r1, c1) = top_left
-            (r2, c2) = bottom_right
-            add_score = 0
-            for r in range(r1, r2 + 1):
-                for c in range(c1, c2 + 1):
-                    if new_grid[r][c] != 0:
-                        add_score += 1
-                    new_grid[r][c] = 0
+            removed = index.apply(top_left, bottom_right)
 
             # 업데이트
-            seq = seq + [(top_left, bottom_right)]
-            score = score + add_score
-            grid = new_grid
+            path = (rect_ids[(top_left, bottom_right)], path)
+            score = score + len(removed)
 
             steps += 1
             iteration += 1
 
         # while -> 다음 스택 항목으로 넘어감
-    return max_score, best_move_sequence
+    reporter.finish(iteration, max_score, best_path)
+    return max_score, _path_moves(best_path, rect_moves)
+
+
+def _subset_reaches(counts, target):
+    """counts[u]개씩 있는 값 u(1~9)들의 부분집합 합으로 target을 만들 수 있는지(비트셋 DP)."""
+    if target == 0:
+        return True
+    limit = (1 << (target + 1)) - 1
+    reach = 1
+    for u in range(1, 10):
+        for _ in range(min(counts[u], target // u)):
+            reach = (reach | (reach << u)) & limit
+    return (reach >> target) & 1 == 1
+
+
+def score_upper_bound(board):
+    """
+    현재 보드에서 앞으로 더 얻을 수 있는 점수의 상한(admissible).
+    위치를 무시한 완화 문제로 계산합니다.
+    1) 값 v인 칸은 다른 남은 값들의 부분집합으로 10-v를 만들 수 있어야 지울 수 있음
+    2) 한 번의 행동은 정확히 합 10을 지우므로, 지우는 칸들의 합은 10의 배수이고 지울 수 있는 칸들의 합을 넘지 않음
+       → 작은 값부터 그 한도까지 채운 칸 수가 상한
+    3) 6 이상인 값은 4 이하인 값들과만 짝지어질 수 있으므로 작은 값의 합이 큰 값을 지울 수 있는 개수를 제한
+    (현재 보드의 합 10 직사각형에 속한 칸만 세는 방식은 이후 새 직사각형이 생기므로 상한이 아님)
+    """
+    cells = board.cells
+    return _value_count_bound(tuple(cells.count(v) for v in range(1, 10)))
 
 
-def exhaustive_solver(initial_grid, max_calls):
+@lru_cache(maxsize=1 << 16)
+def _value_count_bound(value_counts):
+    """score_upper_bound의 본체. 값별 개수만 보므로 개수 튜플로 캐시합니다."""
+    counts = [0] + list(value_counts)
+    clearable = []
+    for v in range(1, 10):
+        if counts[v] == 0:
+            continue
+        counts[v] -= 1
+        if _subset_reaches(counts, 10 - v):
+            clearable.append(v)
+        counts[v] += 1
+    total = sum(v * counts[v] for v in clearable)
+    cap = total - total % 10
+    bound = 0
+    for v in clearable:
+        k = min(counts[v], cap // v)
+        bound += k
+        cap -= k * v
+        if k < counts[v]:
+            break
+
+    # 6 이상인 값은 한 그룹에 하나뿐이고 나머지 10-v는 4 이하의 값들로만 채워짐(9는 정확히 1 하나)
+    # → 큰 값을 지울 수 있는 개수는 작은 값(1~4)의 합을 예산으로 제한됨
+    budget = sum(v * counts[v] for v in clearable if v <= 4)
+    paired = sum(counts[v] for v in clearable if v <= 5)
+    for v in (9, 8, 7, 6):
+        if v not in clearable:
+            continue
+        k = min(counts[v], budget // (10 - v))
+        if v == 9:
+            k = min(k, counts[1])
+        paired += k
+        budget -= k * (10 - v)
+    return min(bound, paired)
+
+
+def exhaustive_solver(initial_grid, max_calls, tt_size=DEFAULT_TT_SIZE, shared_best=None, time_budget=None,
+                      progress=None, cancel=None, seed=None):
     """
     완전 탐색(exhaustive DFS)으로 가능한 모든 직사각형 제거 시퀀스를 탐색하여
     최대 점수(직사각형 안의 0이 아닌 숫자 개수 합)를 찾습니다.
+    하나의 MoveIndex에 행동을 적용(apply)하고 되돌리며(undo) 내려가므로 노드마다 그리드를 복사하지 않습니다.
+    같은 그리드의 재방문은 증분 Zobrist 해시와 고정 크기 치환표(TranspositionTable)로 가지치기하고,
+    서로 겹치지 않는 행동의 순서만 다른 경로는 sleep set으로 처음부터 만들지 않습니다.
+    score + score_upper_bound(보드) <= best_score인 분기는 잘라냅니다(branch-and-bound).
 
     인자:
-    - initial_grid: 2D 리스트(int)
+    - initial_grid: 2D 리스트(int) 또는 Board
     - max_calls: 탐색 노드(재귀 호출) 상한 — 너무 오래 돌아가지 않도록 제한
+    - tt_size: 치환표 버킷 수(2의 거듭제곱으로 올림) — 메모리 사용량과 가지치기 정도를 조절
+    - shared_best: 다른 워커와 공유하는 최고 점수(.value 읽기/쓰기, parallel.py 참고) — 가지치기 기준으로 사용
+    - time_budget: 시간 예산(초). 지나면 탐색을 멈추고 지금까지의 최고를 반환
+    - progress: 진행 상황 콜백(Progress 참고), cancel: 설정되면 멈추는 이벤트(Deadline 참고)
+    - seed: 무작위를 쓰지 않으므로 무시(다른 솔버와 인자를 맞추기 위함)
 
     반환: (max_score, best_move_sequence) — best_move_sequence는 [(r1,c1),(r2,c2), ...]
     """
@@ -299,58 +725,276 @@ def exhaustive_solver(initial_grid, max_calls):
     if not initial_grid or not initial_grid[0]:
         return 0, []
 
-    # 헬퍼: 그리드를 튜플(immutable)로 변환하여 해시 가능하게 함
-    def grid_to_key(g):
-        return tuple(tuple(row) for row in g)
-
+    deadline = Deadline(time_budget, cancel)
     best_score = 0
-    best_sequence = []
-    calls = 0
-    memo = {}  # grid_key -> best score seen for that grid (가지치기용)
+    best_path = None
+    floor = 0  # 가지치기 기준: 이 워커와 다른 워커가 찾은 점수 중 최고
+    calls = 1  # 시작 노드 포함
+    index = MoveIndex(initial_grid)
+    table = TranspositionTable(tt_size)  # Zobrist hash -> best score seen for that grid (가지치기용)
+    keys, _ = _zobrist_keys(index.n_rows * index.n_cols)
+    n_cols = index.n_cols
+    catalog = rect_catalog(index.n_rows, n_cols)
+    (rect_moves, rect_ids) = (catalog.moves, catalog.ids)
+    reporter = Progress(progress, materialize=lambda path: _path_moves(path, rect_moves))
+    value_counts = [index.board.cells.count(v) for v in range(1, 10)]  # 상한 계산용 값별 개수 (증분 갱신)
 
     # 내부 DFS 재귀
-    def dfs(grid, sequence, score):
-        nonlocal best_score, best_sequence, calls
-        calls += 1
-        if calls > max_calls:
-            return
-        key = grid_to_key(grid)
-        # 가지치기: 같은 그리드에서 이미 더 높은 점수를 본 경우 중단
-        prev_best = memo.get(key)
-        if prev_best is not None and score <= prev_best:
-            return
-        memo[key] = score
-
+    # sleep: 이 노드에서 다시 시도할 필요가 없는 행동 목록 (sleep set).
+    # 겹치지 않는 두 직사각형 제거는 순서를 바꿔도 같은 보드가 되므로(교환 가능),
+    # 형제 a를 끝까지 탐색한 뒤에는 그 뒤 형제 b의 서브트리에서 a를 b와 겹치지 않는 한 재우고
+    # 같은 행동 집합의 다른 순열을 아예 만들지 않습니다.
+    # (치환표와 함께 쓰면 이론상 일부 상태를 덜 볼 수 있으나, 어차피 max_calls로 잘리는 근사 탐색임)
+    def dfs(h, score, sleep, path, depth):
+        nonlocal best_score, best_path, calls, floor
         # 업데이트 최고
         if score > best_score:
             best_score = score
-            best_sequence = sequence[:]
+            best_path = path
+            floor = max(floor, score)
+            if shared_best is not None:
+                shared_best.value = score
 
         # 가능한 행동 모두 구함
-        actions = find_all_sum_10_areas(grid)
+        actions = index.moves()
         if not actions:
             return
 
-        # 완전 탐색: 모든 가능한 행동에 대해 재귀
+        done = list(sleep)
+        asleep = set(sleep)
+        # 완전 탐색: 모든 가능한 행동에 대해 재귀 (잠든 행동 제외)
         for (priority, top_left, bottom_right) in actions:
-            r1, c1 = top_left
-            r2, c2 = bottom_right
-            # 적용: 해당 영역의 0이 아닌 갯수를 세고 0으로 만듬
-            new_grid = [row[:] for row in grid]
-            add = 0
-            for r in range(r1, r2 + 1):
-                for c in range(c1, c2 + 1):
-                    if new_grid[r][c] != 0:
-                        add += 1
-                        new_grid[r][c] = 0
-            if add == 0:
+            move = (top_left, bottom_right)
+            if move in asleep:
+                continue
+            # 적용: 해당 영역의 0이 아닌 칸을 0으로 만듬 (합 테이블 갱신은 가지치기 뒤로 미룸)
+            removed = index.clear(top_left, bottom_right)
+            if not removed:
                 # 의미없는 행동(영역이 이미 0으로만 구성) 건너뜀
                 continue
-            dfs(new_grid, sequence + [(top_left, bottom_right)], score + add)
-            if calls > max_calls:
+            calls += 1
+            if calls > max_calls or deadline.expired():
+                index.undo(removed, committed=False)
+                return
+            if shared_best is not None and calls & 1023 == 0:
+                floor = max(floor, shared_best.value)
+            reporter.update(calls, best_score, best_path)
+            new_score = score + len(removed)
+            new_h = h
+            for (r, c, v) in removed:
+                new_h ^= keys[(r * n_cols + c) * 10 + v]
+            # 가지치기: 같은 그리드에서 이미 더 높은 점수를 본 경우 중단
+            prev_best = table.probe(new_h)
+            if prev_best is not None and new_score <= prev_best:
+                index.undo(removed, committed=False)
+                done.append(move)
+                continue
+            table.store(new_h, new_score, depth + 1)
+            # 분기 한정: 이 상태에서 얻을 수 있는 최대 점수로도 현재 최고를 넘지 못하면 중단
+            for (_, _, v) in removed:
+                value_counts[v - 1] -= 1
+            bound = _value_count_bound(tuple(value_counts))
+            if new_score + bound <= floor:
+                for (_, _, v) in removed:
+                    value_counts[v - 1] += 1
+                index.undo(removed, committed=False)
+                done.append(move)
+                continue
+
+            # 자식의 sleep set: 이미 탐색한 행동 중 이번 행동과 겹치지 않는(교환 가능한) 것
+            (r1, c1) = top_left
+            (r2, c2) = bottom_right
+            child_sleep = [m for m in done
+                           if m[0][0] > r2 or m[1][0] < r1 or m[0][1] > c2 or m[1][1] < c1]
+
+            index.commit(removed)
+            dfs(new_h, new_score, child_sleep, (rect_ids[move], path), depth + 1)
+            index.undo(removed)
+            for (_, _, v) in removed:
+                value_counts[v - 1] += 1
+            done.append(move)
+            if calls > max_calls or deadline.expired():
                 return
 
     # 시작
-    start_grid = [row[:] for row in initial_grid]
-    dfs(start_grid, [], 0)
-    return best_score, best_sequence
+    root_h = zobrist_hash(index.board)
+    table.store(root_h, 0, 0)
+    dfs(root_h, 0, [], None, 0)
+    reporter.finish(calls, best_score, best_path)
+    return best_score, _path_moves(best_path, rect_moves)
+
+
+def _count_moves(board):
+    if ENGINE == 'numpy':
+        return len(find_sum_10_moves_np(board)[1])
+    return len(_find_all_sum_10_areas_py(board))
+
+
+# beam_solver 평가 함수: (board, score) -> 값이 클수록 좋은 상태
+HEURISTICS = {
+    'score': lambda board, score: score,
+    'bound': lambda board, score: score + score_upper_bound(board),
+    'mobility': lambda board, score: score + 0.5 * _count_moves(board),
+}
+
+
+def beam_solver(initial_grid, width, heuristic='bound', time_budget=None, progress=None, cancel=None, seed=None):
+    """
+    빔 탐색. 한 번에 한 층(행동 하나)씩 전개하고, 층마다 평가값 상위 width개 상태만 남깁니다.
+    - initial_grid: 2D 리스트(int) 또는 Board
+    - width: 층마다 남길 상태 수 — 실행 시간은 width에 비례
+    - heuristic: HEURISTICS의 이름 또는 (board, score) -> 값 함수
+    - time_budget: 시간 예산(초). 지나면 전개 중인 층을 멈추고 지금까지의 최고를 반환
+    - progress: 진행 상황 콜백(Progress 참고), cancel: 설정되면 멈추는 이벤트(Deadline 참고)
+    - seed: 무작위를 쓰지 않으므로 무시(다른 솔버와 인자를 맞추기 위함)
+    같은 층에서 같은 보드가 여러 경로로 나오면 하나만 남깁니다(같은 보드면 점수도 같음).
+    """
+    print("b")
+    deadline = Deadline(time_budget, cancel)
+    nodes = 0
+    evaluate = HEURISTICS[heuristic] if isinstance(heuristic, str) else heuristic
+    width = max(1, width)
+    max_score = 0
+    best_path = None
+    root = Board.from_grid(initial_grid)
+    catalog = rect_catalog(root.n_rows, root.n_cols)
+    (rect_moves, rect_ids) = (catalog.moves, catalog.ids)
+    reporter = Progress(progress, materialize=lambda path: _path_moves(path, rect_moves))
+    layer = [(root, None, 0)]
+    while layer:
+        children = {}
+        for (board, path, score) in layer:
+            if deadline.expired():
+                break
+            reporter.update(nodes, max_score, best_path)
+            nodes += 1
+            for (_, top_left, bottom_right) in MoveIndex(board).moves():
+                child, removed = board.clear(top_left, bottom_right)
+                if not removed or child in children:
+                    continue
+                children[child] = ((rect_ids[(top_left, bottom_right)], path), score + len(removed))
+        if deadline.expired():
+            # 시간이 다 됐으면 평가와 선택 없이 이 층에서 찾은 최고만 기록하고 멈춤
+            for (path, score) in children.values():
+                if score > max_score:
+                    max_score = score
+                    best_path = path
+            break
+        candidates = []
+        for child, (path, score) in children.items():
+            if score > max_score:
+                max_score = score
+                best_path = path
+            candidates.append((evaluate(child, score), child, path, score))
+        layer = [(child, path, score) for (_, child, path, score)
+                 in heapq.nlargest(width, candidates, key=lambda x: x[0])]
+    reporter.finish(nodes, max_score, best_path)
+    return max_score, _path_moves(best_path, rect_moves)
+
+
+class _MCTSNode:
+    __slots__ = ('board', 'score', 'move', 'parent', 'children', 'untried', 'visits', 'total')
+
+    def __init__(self, board, score, move=None, parent=None):
+        self.board = board
+        self.score = score
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = None  # 아직 자식으로 만들지 않은 행동 (우선순위 순), 첫 방문 때 채움
+        self.visits = 0
+        self.total = 0.0
+
+
+def _rollout_action(board, actions, random_gen, epsilon):
+    """h_iteration_solver와 같은 기준(0 인접 필터 후 priority 최소)으로 고르고, epsilon 확률로 무작위로 고릅니다."""
+    near_zero = contain_or_adjacent_to_zero_batch(board, actions)
+    possible_actions = [action for (action, near) in zip(actions, near_zero) if near]
+    if not possible_actions:
+        possible_actions = actions
+    if random_gen.random() < epsilon:
+        return random_gen.choice(possible_actions)
+    return min(possible_actions, key=lambda x: x[0])
+
+
+def mcts_solver(initial_grid, max_iteration, exploration=0.5, widening=0.5, epsilon=0.2, time_budget=None,
+                progress=None, cancel=None, seed=None):
+    """
+    몬테카를로 트리 탐색(UCT).
+    - initial_grid: 2D 리스트(int) 또는 Board
+    - max_iteration: 시뮬레이션(선택-확장-롤아웃-역전파) 횟수
+    - exploration: UCT 탐험 계수
+    - widening: 점진적 확장 지수 — 방문 n번인 노드는 자식을 ceil(n ** widening)개까지만 만듦(우선순위 순)
+    - epsilon: 롤아웃에서 우선순위 대신 무작위 행동을 고를 확률
+    - time_budget: 시간 예산(초)
+    - progress: 진행 상황 콜백(Progress 참고), cancel: 설정되면 멈추는 이벤트(Deadline 참고)
+    - seed: 롤아웃 난수 seed. 같은 seed면 (시간 예산이 없을 때) 같은 결과
+    언제 멈춰도 그때까지 찾은 최고 경로(트리 경로 + 롤아웃)를 반환하는 anytime 알고리즘입니다.
+    """
+    print("m")
+    deadline = Deadline(time_budget, cancel)
+    reporter = Progress(progress)
+    random_gen = random.Random(seed)
+    root = _MCTSNode(Board.from_grid(initial_grid), 0)
+    scale = max(1, root.board.count_nonzero())  # 보상을 0~1로 정규화
+    max_score = 0
+    best_move_sequence = []
+
+    iteration = 0
+    for iteration in range(max_iteration):
+        if deadline.expired():
+            break
+        reporter.update(iteration, max_score, best_move_sequence)
+        # 1) 선택: 자식을 더 만들 수 있으면 멈추고, 아니면 UCT 값이 가장 큰 자식으로 내려감
+        node = root
+        while True:
+            if node.untried is None:
+                node.untried = [(top_left, bottom_right) for (_, top_left, bottom_right) in MoveIndex(node.board).moves()]
+                node.untried.reverse()  # pop()이 우선순위가 가장 좋은 행동을 꺼내도록
+            if node.untried and len(node.children) < math.ceil((node.visits + 1) ** widening):
+                break
+            if not node.children:
+                break
+            log_n = math.log(node.visits)
+            node = max(node.children,
+                       key=lambda child: child.total / child.visits + exploration * math.sqrt(log_n / child.visits))
+
+        # 2) 확장
+        if node.untried:
+            move = node.untried.pop()
+            child_board, removed = node.board.clear(move[0], move[1])
+            child = _MCTSNode(child_board, node.score + len(removed), move, node)
+            node.children.append(child)
+            node = child
+
+        # 3) 롤아웃
+        board = node.board
+        score = node.score
+        rollout = []
+        while True:
+            actions = MoveIndex(board).moves()
+            if not actions:
+                break
+            (_, top_left, bottom_right) = _rollout_action(board, actions, random_gen, epsilon)
+            board, removed = board.clear(top_left, bottom_right)
+            score += len(removed)
+            rollout.append((top_left, bottom_right))
+
+        if score > max_score:
+            max_score = score
+            path = []
+            walker = node
+            while walker.parent is not None:
+                path.append(walker.move)
+                walker = walker.parent
+            best_move_sequence = path[::-1] + rollout
+
+        # 4) 역전파
+        reward = score / scale
+        while node is not None:
+            node.visits += 1
+            node.total += reward
+            node = node.parent
+
+    reporter.finish(iteration, max_score, best_move_sequence)
+    return max_score, best_move_sequence
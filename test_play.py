@@ -0,0 +1,40 @@
+import pytest
+
+import play
+from benchmark import generate_boards
+from board import Board
+from parallel import SOLVERS
+from search import MoveIndex
+
+# 솔버마다 테스트가 오래 걸리지 않을 만큼 작은 인자
+PARAMS = {
+    'exhaustive': {'max_calls': 2000},
+    'h-iteration': {'branches': 2, 'n_iteration': 2},
+    'r-iteration': {'max_iteration': 500},
+    'n-iteration': {'guess_limit': 500},
+    'iterative': {'guess_limit': 500},
+    'beam': {'width': 3},
+    'mcts': {'max_iteration': 20},
+}
+
+
+@pytest.mark.parametrize('solver', sorted(SOLVERS))
+def test_play_pipelined_headless(solver, monkeypatch):
+    """드래그를 보드 갱신으로 바꿔 화면 없이 끝까지 두고, 모든 수가 합 10이며 점수가 맞는지 확인합니다."""
+    grid = generate_boards(1, seed=7)[0]
+    state = {'board': Board.from_grid(grid)}
+
+    def plan_drags(chunk, pos_dict, initial_grid=None):
+        for ((r1, c1), (r2, c2)) in chunk:
+            board = state['board']
+            assert sum(board[r][c] for r in range(r1, r2 + 1) for c in range(c1, c2 + 1)) == 10
+            (state['board'], _) = board.clear((r1, c1), (r2, c2))
+        return []
+
+    monkeypatch.setattr(play, 'plan_drags', plan_drags)
+    monkeypatch.setattr(play, 'run_drags', lambda drags, hold=0.0, rate=None: None)
+    stats = play.play_pipelined(grid, [], [], {}, solver=solver, params=dict(PARAMS[solver], seed=0),
+                                first_time=0.2, refine_time=0.05)
+    assert stats['score'] == 170 - state['board'].count_nonzero()
+    # 남은 수가 있는데 멈추지 않음
+    assert not MoveIndex(state['board']).moves()
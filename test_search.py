@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+from board import Board
+from search import (MoveIndex, _as_tuples, _find_all_sum_10_areas_py, check_engines, exhaustive_solver,
+                    find_sum_10_moves_np, np)
+from util import contain_or_adjacent_to_zero, contain_or_adjacent_to_zero_batch
+
+
+def random_grid(rng, n_rows, n_cols, zeros=0.0):
+    """1~9 보드 (zeros 비율만큼 칸을 0으로)."""
+    return [[0 if rng.random() < zeros else rng.randint(1, 9) for _ in range(n_cols)] for _ in range(n_rows)]
+
+
+def brute_force(grid):
+    """메모이제이션만 쓰는 단순 완전 탐색의 최고 점수 (기준값)."""
+    memo = {}
+
+    def best(board):
+        if board not in memo:
+            scores = [0]
+            for (_, top_left, bottom_right) in _find_all_sum_10_areas_py(board.to_grid()):
+                (child, removed) = board.clear(top_left, bottom_right)
+                scores.append(len(removed) + best(child))
+            memo[board] = max(scores)
+        return memo[board]
+
+    return best(Board.from_grid(grid))
+
+
+def replay_score(grid, move_sequence):
+    """move_sequence를 차례로 두며 모든 수가 합 10인지 확인하고 점수를 반환합니다."""
+    board = Board.from_grid(grid)
+    score = 0
+    for (top_left, bottom_right) in move_sequence:
+        ((r1, c1), (r2, c2)) = (top_left, bottom_right)
+        assert sum(board[r][c] for r in range(r1, r2 + 1) for c in range(c1, c2 + 1)) == 10
+        (board, removed) = board.clear(top_left, bottom_right)
+        score += len(removed)
+    return score
+
+
+@pytest.mark.skipif(np is None, reason="NumPy not installed")
+@pytest.mark.parametrize('seed', range(20))
+def test_numpy_engine_matches_python(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 10, 17, zeros=0.3 * (seed % 3))
+    assert check_engines(grid)
+    assert _as_tuples(*find_sum_10_moves_np(grid)) == _find_all_sum_10_areas_py(grid)
+
+
+@pytest.mark.parametrize('engine', ['python', 'numpy'])
+@pytest.mark.parametrize('seed', range(5))
+def test_move_index_apply_undo(engine, seed):
+    if engine == 'numpy' and np is None:
+        pytest.skip("NumPy not installed")
+    rng = random.Random(seed)
+    grid = random_grid(rng, 10, 17)
+    index = MoveIndex(grid, engine=engine)
+    history = []
+    # 무작위로 내려가면서 매번 다시 계산한 이동 목록과 비교
+    while True:
+        moves = index.moves()
+        assert moves == _find_all_sum_10_areas_py(index.board.to_grid())
+        if not moves:
+            break
+        (_, top_left, bottom_right) = rng.choice(moves)
+        history.append((index.board, index.apply(top_left, bottom_right)))
+    # 되돌리면서 보드와 이동 목록이 원래대로 돌아오는지 확인
+    for (board, removed) in reversed(history):
+        index.undo(removed)
+        assert index.board == board
+        assert index.moves() == _find_all_sum_10_areas_py(board.to_grid())
+    assert index.board == Board.from_grid(grid)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_zero_filter_batch_matches_scalar(seed):
+    rng = random.Random(seed)
+    grid = random_grid(rng, 10, 17, zeros=0.1 * seed)
+    moves = [(0, (r1, c1), (r2, c2)) for r1 in range(10) for r2 in range(r1, 10)
+             for c1 in range(17) for c2 in range(c1, 17)]
+    expected = [contain_or_adjacent_to_zero(grid, top_left, bottom_right) for (_, top_left, bottom_right) in moves]
+    assert contain_or_adjacent_to_zero_batch(grid, moves) == expected
+    assert contain_or_adjacent_to_zero_batch(Board.from_grid(grid), moves) == expected
+    if np is not None:
+        array = np.array([(r1, c1, r2, c2) for (_, (r1, c1), (r2, c2)) in moves])
+        assert list(contain_or_adjacent_to_zero_batch(grid, array)) == expected
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_exhaustive_matches_brute_force(seed):
+    rng = random.Random(seed)
+    # 작은 값이 많아야 합 10인 영역이 많아져 수순이 길어짐
+    grid = [[rng.choice([1, 1, 2, 2, 3, 4, 5, 6, 7, 8, 9]) for _ in range(5)] for _ in range(4)]
+    (score, move_sequence) = exhaustive_solver(grid, max_calls=10 ** 7)
+    assert score == brute_force(grid)
+    assert replay_score(grid, move_sequence) == score
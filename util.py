@@ -1,6 +1,18 @@
 import requests
 from dotenv import load_dotenv
+import atexit
 import os
+import queue
+import threading
+import time
+
+from board import Board
+from catalog import rect_catalog, zero_mask
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 def cluster_positions(positions, threshold=20):
     """
@@ -51,10 +63,132 @@ def contain_or_adjacent_to_zero(initial_grid, top_left, bottom_right):
             return True
     return False
 
+def contain_or_adjacent_to_zero_batch(grid, moves):
+    """
+    contain_or_adjacent_to_zero를 후보 행동 전체에 한 번에 적용해 bool 목록을 반환합니다.
+    - moves가 find_all_sum_10_areas / MoveIndex.moves() 형식 [(priority, top_left, bottom_right), ...]이면
+      보드의 0 마스크를 한 번 만들고 후보마다 RectCatalog의 (안쪽 + 테두리) 비트마스크와 AND 한 번으로 판정
+    - moves가 find_sum_10_moves_np 형식 (k, 4) 배열 [r1, c1, r2, c2]이면
+      상하좌우로 팽창시킨 0 마스크의 누적합으로 모든 직사각형을 벡터화 판정해 bool 배열을 반환
+    직사각형이 0을 포함하거나 0에 상하좌우로 붙어 있음 <=> 팽창한 0 마스크와 겹침 이므로 두 방식의 결과는 같습니다.
+    """
+    board = Board.from_grid(grid)
+    if np is not None and isinstance(moves, np.ndarray):
+        zero = np.pad(board.array() == 0, 1)
+        dilated = zero[1:-1, 1:-1] | zero[:-2, 1:-1] | zero[2:, 1:-1] | zero[1:-1, :-2] | zero[1:-1, 2:]
+        ps = np.zeros((board.n_rows + 1, board.n_cols + 1), dtype=np.int32)
+        ps[1:, 1:] = dilated.cumsum(axis=0).cumsum(axis=1)
+        (r1, c1, r2, c2) = moves.T
+        return ps[r2 + 1, c2 + 1] - ps[r1, c2 + 1] - ps[r2 + 1, c1] + ps[r1, c1] > 0
+    catalog = rect_catalog(board.n_rows, board.n_cols)
+    (near_mask, ids) = (catalog.near_mask, catalog.ids)
+    zeros = zero_mask(board)
+    return [near_mask[ids[(top_left, bottom_right)]] & zeros != 0 for (_, top_left, bottom_right) in moves]
+
+class Uploader:
+    """
+    보드 데이터를 백그라운드 스레드에서 보내는 업로더. submit()은 큐에 넣기만 하고 바로 돌아오므로
+    서버가 느리거나 꺼져 있어도 스캔(GUI 스레드)이 기다리지 않습니다.
+    - 연결을 재사용하는 requests.Session 하나로 보냄
+    - 큐에 쌓인 것을 batch_wait초 동안 최대 batch_size개까지 모아 한 요청으로 보냄 ({'data': [...]})
+    - 연결 오류나 5xx 응답이면 backoff * 2^시도 초 쉬고 최대 retries번 다시 보냄
+    - 큐(max_queue개)가 꽉 차면 새 데이터는 버림 (dropped에 개수 기록)
+    """
+
+    def __init__(self, url, max_queue=100, batch_size=10, batch_wait=0.5, retries=3, backoff=0.5, timeout=5.0):
+        self.url = url
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.sent = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._session = requests.Session()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, data):
+        """data를 보낼 큐에 넣고 넣었는지 반환합니다. 큐가 꽉 찼으면 버립니다."""
+        try:
+            self._queue.put_nowait(data)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout=5.0):
+        """남은 데이터를 최대 timeout초 동안 보내고 스레드를 멈춥니다."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._session.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.batch_wait
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._post(batch)
+            if stop:
+                return
+
+    def _post(self, batch):
+        for attempt in range(self.retries + 1):
+            try:
+                response = self._session.post(self.url, json={'data': batch}, timeout=self.timeout)
+                if response.status_code < 500:
+                    # 4xx는 다시 보내도 같으므로 재시도하지 않음
+                    if response.ok:
+                        self.sent += len(batch)
+                    print(response.status_code, response.text)
+                    return
+            except requests.RequestException as e:
+                print(f"Upload failed ({attempt + 1}/{self.retries + 1}): {e}")
+            if attempt < self.retries:
+                time.sleep(self.backoff * 2 ** attempt)
+        self.dropped += len(batch)
+
+
+_DISABLED = object()  # URL이 없어 업로드하지 않기로 한 상태
+_uploader = None
+_uploader_lock = threading.Lock()
+
+
+def _get_uploader():
+    global _uploader
+    with _uploader_lock:
+        if _uploader is None:
+            # .env는 처음 한 번만 읽음 (URL이 없어도 다시 읽지 않음)
+            load_dotenv()
+            URL = os.environ.get('URL')
+            print(URL)
+            if URL:
+                _uploader = Uploader(URL)
+                atexit.register(_uploader.close)
+            else:
+                _uploader = _DISABLED
+        return None if _uploader is _DISABLED else _uploader
+
+
 def send_data(data):
-    load_dotenv()
-    URL = os.environ.get('URL')
-    print(URL)
-    payload = {'data': data}
-    response = requests.post(URL, json=payload)
-    print(response.json())
\ No newline at end of file
+    """data를 서버로 보내도록 큐에 넣고 바로 돌아옵니다 (URL이 없거나 큐가 꽉 찼으면 False)."""
+    uploader = _get_uploader()
+    if uploader is None:
+        return False
+    return uploader.submit(data)
\ No newline at end of file